@@ -0,0 +1,132 @@
+"""
+Seeded generator of synthetic Python sources for benchmarking the analyzers.
+
+Every kind takes a `size` (its scaling dimension) and a seed; the same (kind, size,
+seed) always produces the same text.
+
+    python -m benchmarks.corpus many_functions 500 --seed 1 > /tmp/sample.py
+"""
+import argparse
+import random
+import sys
+
+# CPython refuses more than 100 levels of indentation ("too many levels of indentation")
+MAX_INDENT_DEPTH = 90
+
+NAMES = ["data", "items", "total", "result", "value", "count", "buffer", "index", "row", "node"]
+BAD_NAMES = ["Data", "myValue", "TOTAL", "X"]
+
+def _name(rng):
+    return rng.choice(NAMES) + str(rng.randrange(100))
+
+def _statement(rng, indent):
+    pad = "    " * indent
+    roll = rng.random()
+    if roll < 0.25:
+        return f"{pad}{_name(rng)} = {_name(rng)} + {rng.randrange(1000)}"
+    if roll < 0.45:
+        return f"{pad}{_name(rng)}.append({_name(rng)})"
+    if roll < 0.6:
+        return f"{pad}{_name(rng)} += {rng.randrange(10)}"
+    if roll < 0.7:
+        return f"{pad}{rng.choice(BAD_NAMES)}={rng.randrange(10)}"
+    if roll < 0.85:
+        return f"{pad}print({_name(rng)}, {_name(rng)!r})"
+    return f"{pad}{_name(rng)} = helper({_name(rng)}, key={rng.randrange(5)})  # note"
+
+def many_functions(size, rng):
+    """`size` functions, each with a loop body, appends, `+=` and occasional recursion."""
+    out = ["import os", "from collections import defaultdict", ""]
+    for i in range(size):
+        name = f"func_{i}" if rng.random() > 0.1 else f"Func{i}"
+        out.append(f"def {name}(a, b=None):")
+        out.append(f"    \"\"\"Generated function {i}.\"\"\"")
+        out.append("    acc = []")
+        out.append("    for i in range(a):")
+        for _ in range(rng.randrange(1, 5)):
+            out.append(_statement(rng, 2))
+        if rng.random() < 0.2:
+            out.append(f"    return {name}(a - 1) if a else acc")
+        else:
+            out.append("    return acc")
+        out.append("")
+    return "\n".join(out) + "\n"
+
+def deep_nesting(size, rng):
+    """One block nested `size` levels deep (capped at MAX_INDENT_DEPTH), alternating for/if/while."""
+    depth = min(size, MAX_INDENT_DEPTH)
+    out = ["def nested(n):"]
+    for level in range(1, depth + 1):
+        pad = "    " * level
+        kind = level % 3
+        if kind == 0:
+            out.append(f"{pad}for i{level} in range(n):")
+        elif kind == 1:
+            out.append(f"{pad}if n > {level}:")
+        else:
+            out.append(f"{pad}while n > {level}:")
+        out.append(_statement(rng, level + 1))
+    out.append("    " * (depth + 1) + "return n")
+    return "\n".join(out) + "\n"
+
+def long_lines(size, rng):
+    """`size` statements with very long lines (long expressions and string literals)."""
+    out = []
+    for i in range(size):
+        terms = " + ".join(_name(rng) for _ in range(rng.randrange(10, 40)))
+        out.append(f"value_{i} = {terms}")
+        out.append(f"message_{i} = {('x' * rng.randrange(80, 400))!r}  # {'#' * 10}")
+    return "\n".join(out) + "\n"
+
+def broken_syntax(size, rng):
+    """`size` functions where about a third have a missing colon, empty body or stray bracket."""
+    out = []
+    for i in range(size):
+        roll = rng.random()
+        if roll < 0.1:
+            out.append(f"def broken_{i}(a)")
+            out.append("    return a")
+        elif roll < 0.2:
+            out.append(f"class Broken{i}:")
+        elif roll < 0.3:
+            out.append(f"if value_{i} > 0")
+            out.append(f"    print(value_{i}")
+        else:
+            out.append(f"def ok_{i}(a):")
+            out.append(_statement(rng, 1))
+            out.append("    return a")
+        out.append("")
+    return "\n".join(out) + "\n"
+
+def huge_literals(size, rng):
+    """One list, dict and nested-call literal with `size` elements each."""
+    items = ", ".join(str(rng.randrange(10 ** 6)) for _ in range(size))
+    pairs = ", ".join(f"'k{i}': [{i}, {i + 1}, 'v{i}']" for i in range(size))
+    calls = "value"
+    for i in range(min(size, 150)):  # nested calls beyond ~200 hit the parser's nesting limit
+        calls = f"wrap({calls}, {i})"
+    return f"NUMBERS = [{items}]\ntable = {{{pairs}}}\nresult = {calls}\nprint(len(NUMBERS), len(table))\n"
+
+KINDS = {
+    'many_functions': many_functions,
+    'deep_nesting': deep_nesting,
+    'long_lines': long_lines,
+    'broken_syntax': broken_syntax,
+    'huge_literals': huge_literals,
+}
+
+def generate(kind, size, seed=0):
+    """Return the synthetic source for (kind, size, seed)."""
+    return KINDS[kind](size, random.Random(f"{kind}:{size}:{seed}"))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks.corpus", description="Print a synthetic Python source.")
+    parser.add_argument("kind", choices=sorted(KINDS))
+    parser.add_argument("size", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    sys.stdout.write(generate(args.kind, args.size, seed=args.seed))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
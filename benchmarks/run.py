@@ -0,0 +1,162 @@
+"""
+Benchmark suite for the analyzers over the synthetic corpus.
+
+For every (corpus kind, size, analyzer) it records the best-of-N wall time and the
+tracemalloc peak (measured in a separate run, so tracing does not skew the timing),
+prints scaling exponents between successive sizes, and can save the run as a
+baseline or compare against one (exit 1 on regression).
+
+    python -m benchmarks.run                                   # default matrix
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --threshold 1.3
+    python -m benchmarks.run --kinds many_functions --sizes 100 1000 5000 --analyzers pep8_checks
+"""
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+
+from benchmarks.corpus import KINDS, generate
+from error_helper.core import (
+    attempt_unparse,
+    do_full_analysis,
+    explain_by_ast,
+    performance_hints,
+    safe_parse,
+    simple_auto_fix,
+    suggest_structure,
+)
+from error_helper.pep8 import pep8_checks
+
+# name -> (setup(code) -> arg, run(arg)); setup is excluded from timing
+ANALYZERS = {
+    'pep8_checks': (lambda code: code, pep8_checks),
+    'explain_by_ast': (lambda code: code, explain_by_ast),
+    'performance_hints': (lambda code: code, performance_hints),
+    'suggest_structure': (lambda code: code, suggest_structure),
+    'simple_auto_fix': (lambda code: code, simple_auto_fix),
+    'attempt_unparse': (lambda code: safe_parse(code)[0], lambda tree: tree is not None and attempt_unparse(tree)),
+    'do_full_analysis': (lambda code: code, do_full_analysis),
+}
+
+# deep_nesting scales nesting depth, the others scale statement/element count
+DEFAULT_SIZES = {
+    'many_functions': [50, 200, 800],
+    'deep_nesting': [10, 40, 80],
+    'long_lines': [50, 200, 800],
+    'broken_syntax': [50, 200, 800],
+    'huge_literals': [500, 2000, 8000],
+}
+
+def measure(run, arg, repeat):
+    """Best-of-`repeat` wall time in seconds, then one traced run for the peak bytes."""
+    best = math.inf
+    for _ in range(repeat):
+        t = time.perf_counter()
+        run(arg)
+        best = min(best, time.perf_counter() - t)
+    tracemalloc.start()
+    try:
+        run(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+def run_suite(kinds, analyzers, sizes=None, repeat=3, seed=0, progress=None):
+    results = []
+    for kind in kinds:
+        for size in sizes or DEFAULT_SIZES[kind]:
+            code = generate(kind, size, seed=seed)
+            lines = code.count("\n")
+            for name in analyzers:
+                setup, run = ANALYZERS[name]
+                elapsed, peak = measure(run, setup(code), repeat)
+                row = {'kind': kind, 'size': size, 'analyzer': name, 'lines': lines, 'bytes': len(code),
+                       'time_s': elapsed, 'peak_kb': peak / 1024}
+                results.append(row)
+                if progress:
+                    progress(row)
+    return results
+
+def scaling(results):
+    """Empirical exponent k in time ~ bytes**k between consecutive sizes, per (kind, analyzer)."""
+    series = {}
+    for row in results:
+        series.setdefault((row['kind'], row['analyzer']), []).append(row)
+    out = {}
+    for key, rows in series.items():
+        # bytes, not lines: huge_literals grows without adding lines
+        rows.sort(key=lambda r: r['bytes'])
+        exps = []
+        for a, b in zip(rows, rows[1:]):
+            if a['bytes'] != b['bytes'] and a['time_s'] > 0 and b['time_s'] > 0:
+                exps.append(math.log(b['time_s'] / a['time_s']) / math.log(b['bytes'] / a['bytes']))
+        out[key] = exps
+    return out
+
+def compare(results, baseline, threshold=1.25, min_delta=0.002):
+    """Rows slower (or more memory-hungry) than the baseline by more than `threshold`x."""
+    base = {(r['kind'], r['size'], r['analyzer']): r for r in baseline['results']}
+    regressions = []
+    for row in results:
+        old = base.get((row['kind'], row['size'], row['analyzer']))
+        if old is None:
+            continue
+        if row['time_s'] > old['time_s'] * threshold and row['time_s'] - old['time_s'] > min_delta:
+            regressions.append((row, 'time_s', old['time_s']))
+        if row['peak_kb'] > old['peak_kb'] * threshold and row['peak_kb'] - old['peak_kb'] > 64:
+            regressions.append((row, 'peak_kb', old['peak_kb']))
+    return regressions
+
+def _print_row(row):
+    print(f"{row['kind']:<15} {row['size']:>6} {row['analyzer']:<18} {row['lines']:>7} lines "
+          f"{row['time_s'] * 1000:10.2f} ms {row['peak_kb']:10.0f} KiB")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks.run", description="Benchmark the analyzers on a synthetic corpus.")
+    parser.add_argument("--kinds", nargs="+", choices=sorted(KINDS), default=list(KINDS))
+    parser.add_argument("--analyzers", nargs="+", choices=list(ANALYZERS), default=list(ANALYZERS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=None, help="override sizes for every kind")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the full results to this file")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH", help="baseline to compare against; exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.kinds, args.analyzers, sizes=args.sizes, repeat=args.repeat, seed=args.seed,
+                        progress=_print_row)
+    print("\nscaling (time ~ input bytes^k):")
+    for (kind, name), exps in sorted(scaling(results).items()):
+        if exps:
+            print(f"  {kind:<15} {name:<18} k = " + ", ".join(f"{k:.2f}" for k in exps))
+
+    report = {
+        'meta': {'python': platform.python_version(), 'platform': platform.platform(), 'seed': args.seed,
+                 'repeat': args.repeat},
+        'results': results,
+    }
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=1)
+
+    status = 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, threshold=args.threshold)
+        for row, metric, old in regressions:
+            print(f"REGRESSION {row['kind']}/{row['size']}/{row['analyzer']}: {metric} {old:.4g} -> {row[metric]:.4g}")
+        if not regressions:
+            print(f"no regressions against {args.compare} (threshold {args.threshold}x)")
+        status = 1 if regressions else 0
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+Ultimate Python Error Helper: static analysis core, result cache and batch mode.
+
+Submodules are imported lazily on first attribute access, so `import error_helper`
+stays cheap for pool workers that only need `error_helper.core`.
+"""
+import sys
+
+_LAZY_ATTRS = {
+    'do_full_analysis': 'error_helper.core',
+    'pep8_checks': 'error_helper.pep8',
+    'iter_pep8_issues': 'error_helper.pep8',
+    'check_file': 'error_helper.pep8',
+    'explain_by_ast': 'error_helper.core',
+    'performance_hints': 'error_helper.core',
+    'suggest_structure': 'error_helper.core',
+    'simple_auto_fix': 'error_helper.core',
+    'repair': 'error_helper.autofix',
+    'suggest_rewrite': 'error_helper.core',
+    'AnalysisCache': 'error_helper.cache',
+    'DiskCache': 'error_helper.diskcache',
+    'SandboxPool': 'error_helper.sandbox',
+    'profile_code': 'error_helper.dynamic',
+    'analyze_file': 'error_helper.batch',
+    'analyze_paths': 'error_helper.batch',
+    'analyze_sharded': 'error_helper.shard',
+    'analyze_changed': 'error_helper.gitdiff',
+    'AnalysisService': 'error_helper.server',
+    'register_rule': 'error_helper.rules',
+    'recording': 'error_helper.instrument',
+    'Recorder': 'error_helper.instrument',
+}
+
+__all__ = sorted(_LAZY_ATTRS)
+
+def __getattr__(name):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'error_helper' has no attribute '{name}'")
+    __import__(module)
+    value = getattr(sys.modules[module], name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
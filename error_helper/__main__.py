@@ -0,0 +1,106 @@
+"""
+Command line for batch mode:
+
+    python -m error_helper src/ tests/*.py --jobs 8 > report.jsonl
+    python -m error_helper generated/huge_module.py --shard --jobs 32
+    python -m error_helper --diff --staged                  # pre-commit: staged lines only
+    python -m error_helper src/ --diff --base origin/main   # CI: lines changed since main
+    python -m error_helper new.py --against old.py     # lines of new.py that differ
+"""
+import argparse
+import json
+import os
+import sys
+
+from error_helper.batch import analyze_paths
+from error_helper.diskcache import default_path
+from error_helper.gitdiff import changed_lines, git_changed, git_staged
+from error_helper.rules import all_rules, find_config, load_config, select
+
+def _names(values):
+    return [name.strip() for value in values for name in value.split(",") if name.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="error_helper", description="Analyze Python files and stream JSON-lines results.")
+    parser.add_argument("targets", nargs="*", help="files, directories or glob patterns")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=None, help="files per scheduling chunk (default: auto)")
+    parser.add_argument("--shard", action="store_true",
+                        help="split each large file across the workers (for a few very large files)")
+    parser.add_argument("--max-line-length", type=int, default=79)
+    parser.add_argument("--explain", action="store_true", help="include per-line explanations")
+    parser.add_argument("--fix", action="store_true", help="include the auto-fixed source for files with syntax errors")
+    parser.add_argument("--pep8-only", action="store_true",
+                        help="stream style checks only (no AST), for very large generated files")
+    parser.add_argument("--cache", default=None, metavar="FILE",
+                        help="persistent result cache shared with other runs and the web page "
+                             "(default: $ERROR_HELPER_CACHE_DIR or ~/.cache/error_helper/analysis.sqlite3)")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the persistent cache")
+    parser.add_argument("--config", default=None, metavar="FILE",
+                        help="rule selection (default: nearest error_helper.toml or pyproject.toml [tool.error_helper])")
+    parser.add_argument("--disable", action="append", default=[], metavar="RULES",
+                        help="comma-separated rule ids or groups (pep8, explain, perf, structure) to switch off")
+    parser.add_argument("--enable", action="append", default=[], metavar="RULES",
+                        help="comma-separated rule ids or groups to switch on")
+    parser.add_argument("--diff", action="store_true",
+                        help="report only lines changed in the working tree according to git (without targets: "
+                             "every changed .py file)")
+    parser.add_argument("--base", default="HEAD", metavar="REV", help="with --diff: the revision to compare with")
+    parser.add_argument("--staged", action="store_true", help="with --diff: the staged changes instead (for pre-commit)")
+    parser.add_argument("--against", default=None, metavar="FILE",
+                        help="report only lines of the (single) target that differ from FILE, an older version")
+    parser.add_argument("--list-rules", action="store_true", help="print the available rules and exit")
+    args = parser.parse_args(argv)
+    if args.list_rules:
+        for rule in all_rules():
+            print(f"{rule.id:32} {'on ' if rule.default else 'off'} {rule.description}")
+        return 0
+    if args.diff and args.against:
+        parser.error("--diff and --against are mutually exclusive")
+    if args.staged and not args.diff:
+        parser.error("--staged needs --diff")
+    if not args.targets and not args.diff:
+        parser.error("the following arguments are required: targets")
+    changed = sources = None
+    if args.against:
+        if len(args.targets) != 1 or not os.path.isfile(args.targets[0]):
+            parser.error("--against needs exactly one target file")
+        try:
+            with open(args.against, encoding="utf-8", errors="replace") as f:
+                old = f.read()
+            with open(args.targets[0], encoding="utf-8", errors="replace") as f:
+                new = f.read()
+        except OSError as e:
+            parser.error(str(e))
+        changed = {os.path.realpath(args.targets[0]): changed_lines(old, new)}
+    elif args.diff:
+        try:
+            changed = git_changed(args.targets, base=args.base, staged=args.staged)
+            if args.staged:  # the staged line numbers refer to the index version, not the working tree
+                sources = git_staged([path for path, ranges in changed.items() if ranges])
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        if not args.targets:
+            args.targets = sorted(path for path in changed if path.endswith(".py"))
+    config = args.config or find_config()
+    try:
+        base = load_config(config) if config else None
+        rules = select(disable=_names(args.disable), enable=_names(args.enable), base=base)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    cache_path = None if args.no_cache else (args.cache or default_path())
+
+    failed = False
+    out = sys.stdout
+    for record in analyze_paths(args.targets, jobs=args.jobs, chunksize=args.chunksize,
+                                max_line_len=args.max_line_length, explain=args.explain, fix=args.fix,
+                                pep8_only=args.pep8_only, cache_path=cache_path, rules=rules, shard=args.shard,
+                                changed=changed, sources=sources):
+        if record.get('error') or record.get('syntax_error'):
+            failed = True
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""
+Error-location-driven repair of broken Python source.
+
+Instead of rewriting every line by pattern, the parser says where it failed
+(SyntaxError line, offset and message) and one targeted fix is applied there:
+a missing ':', an empty block, an unclosed or stray bracket, an unterminated
+string, a bad indent, a `try` without handler, a Python 2 `print`.
+
+The source is cut into top-level regions (a column-0 statement up to the next one)
+with a single line scan. Runs of regions are parsed together, narrowing down to the
+failing one by the reported location, and only a failing region is repaired and reparsed, up to `max_passes`
+fixes per region. Work stays roughly linear in the file size for a fixed pass bound,
+and several errors in one file are fixed in one call.
+"""
+import ast
+import bisect
+import re
+
+MAX_PASSES = 10
+
+CLOSERS = {"(": ")", "[": "]", "{": "}"}
+HEADER_KEYWORDS = frozenset({
+    "def", "class", "if", "elif", "else", "for", "while", "with", "try", "except", "finally", "async",
+})
+# a column-0 line starting with one of these begins a statement even if brackets look unbalanced
+STATEMENT_KEYWORDS = HEADER_KEYWORDS | {"import", "from", "return", "raise", "assert", "del", "global", "pass"}
+CONTINUATION_KEYWORDS = frozenset({"else", "elif", "except", "finally"})
+
+_special_re = re.compile(r"[#'\"\\()\[\]{}]")
+_word_re = re.compile(r"[A-Za-z_]\w*")
+_indented_block_re = re.compile(r"expected an indented block after .* on line (\d+)")
+_never_closed_re = re.compile(r"'([(\[{])' was never closed")
+_mismatch_re = re.compile(r"closing parenthesis '(.)' does not match opening parenthesis '(.)'")
+_py2_print_re = re.compile(r"print\s+(?![(=.,)\]])")
+
+def _scan(line, quote=None, depth=0):
+    """
+    Lex one physical line. Returns (open triple quote or None, bracket depth, index just
+    past the last code character before any comment).
+    """
+    comment = None
+    pos = 0
+    for m in _special_re.finditer(line):
+        i = m.start()
+        if i < pos:
+            continue
+        ch = line[i]
+        if quote is not None:
+            if ch == "\\":
+                pos = i + 2
+            elif line.startswith(quote, i):
+                pos = i + len(quote)
+                quote = None
+        elif ch == "#":
+            comment = i
+            break
+        elif ch in "'\"":
+            quote = ch * 3 if line.startswith(ch * 3, i) else ch
+            pos = i + len(quote)
+        elif ch in "([{":
+            depth += 1
+        elif ch in ")]}":
+            depth = max(0, depth - 1)
+    if quote is not None and len(quote) == 1:
+        quote = None  # a single-quoted string cannot continue on the next line
+    return quote, depth, len(line[:comment].rstrip())
+
+def _code_end(line):
+    return _scan(line)[2]
+
+def _indent(line):
+    return len(line) - len(line.lstrip(" "))
+
+def _first_word(line):
+    m = _word_re.match(line, _indent(line))
+    return m.group() if m else ""
+
+def split_regions(lines):
+    """Half-open (start, end) line ranges, one per top-level statement (with its else/except/... clauses)."""
+    starts = [0]
+    quote, depth = None, 0
+    prev_code = ""
+    for i, line in enumerate(lines):
+        if i and quote is None and line[:1] not in ("", " ", "#", ")", "]", "}") \
+                and not prev_code.startswith("@") and not prev_code.endswith("\\"):
+            word = _first_word(line)
+            if word not in CONTINUATION_KEYWORDS and (depth == 0 or word in STATEMENT_KEYWORDS or line[0] == "@"):
+                starts.append(i)
+                depth = 0
+        in_string = quote is not None
+        quote, depth, _ = _scan(line, quote, depth)
+        stripped = line.strip()
+        if stripped and not in_string and not stripped.startswith("#"):
+            prev_code = stripped
+    return list(zip(starts, starts[1:] + [len(lines)]))
+
+def _syntax_error(lines):
+    """The error ast.parse raises for these lines, or None if they parse."""
+    try:
+        ast.parse("\n".join(lines) + "\n")
+    except SyntaxError as e:
+        return e
+    except (ValueError, RecursionError, MemoryError) as e:  # NUL bytes, nesting limits: nothing to target
+        return e
+    return None
+
+# -----------------------
+# Targeted fixes; each edits `lines` in place and returns a note, or None if it does not apply
+# -----------------------
+def _insert_colon(lines, row, col):
+    line = lines[row]
+    cut = min(col, _code_end(line)) if col else _code_end(line)
+    head = line[:cut].rstrip()
+    lines[row] = head + ":" + line[len(head):]
+    return "เติม ':' ท้ายบรรทัด header"
+
+def _insert_pass(lines, header_row, row):
+    indent = _indent(lines[header_row]) + 4
+    lines.insert(header_row + 1, " " * indent + "pass")
+    return "เติม 'pass' ให้ block ที่ไม่มีเนื้อหา"
+
+def _close_bracket(lines, row, opener):
+    # close at the end of the bracket's continuation lines (those indented deeper than its line)
+    base = _indent(lines[row])
+    last = row
+    for j in range(row + 1, len(lines)):
+        if not lines[j].strip() or _indent(lines[j]) <= base:
+            break
+        last = j
+    end = _code_end(lines[last])
+    lines[last] = lines[last][:end] + CLOSERS[opener] + lines[last][end:]
+    return f"ปิดวงเล็บ '{opener}' ที่ไม่ได้ปิด"
+
+def _close_string(lines, row, col, triple):
+    line = lines[row]
+    start = col
+    while start < len(line) and line[start] not in "'\"":
+        start += 1  # skip a string prefix (f, r, b, ...)
+    if start == len(line):
+        return None
+    if triple:
+        lines.append(" " * _indent(line) + line[start] * 3)
+    else:
+        lines[row] = line.rstrip() + line[start]
+    return "ปิด string ที่ไม่ได้ปิด"
+
+def _shift_block(lines, row, new_indent):
+    # move the line and the deeper lines under it together
+    old = _indent(lines[row])
+    delta = new_indent - old
+    for j in range(row, len(lines)):
+        line = lines[j]
+        if j > row and line.strip() and _indent(line) < old:
+            break
+        if line.strip():
+            lines[j] = " " * (_indent(line) + delta) + line.lstrip(" ")
+
+def _fix_unexpected_indent(lines, row):
+    prev = next((lines[j] for j in range(row - 1, -1, -1) if lines[j].strip()), "")
+    _shift_block(lines, row, _indent(prev))
+    return "ลดการย่อหน้าที่เกิน"
+
+def _fix_unindent(lines, row):
+    # snap to the closest indentation level still open above this line (deeper one on ties)
+    current = _indent(lines[row])
+    levels = [0]
+    for j in range(row):
+        if lines[j].strip() and not lines[j].lstrip().startswith("#"):
+            level = _indent(lines[j])
+            while levels and levels[-1] > level:
+                levels.pop()
+            if not levels or levels[-1] < level:
+                levels.append(level)
+    target = min(levels, key=lambda level: (abs(level - current), -level))
+    _shift_block(lines, row, target)
+    return "ปรับการย่อหน้าให้ตรงกับ block"
+
+def _fix_missing_handler(lines, row):
+    row = min(row, len(lines) - 1)
+    try_row = next((j for j in range(row, -1, -1) if _first_word(lines[j]) == "try"), None)
+    if try_row is None:
+        return None
+    base = _indent(lines[try_row])
+    end = len(lines)
+    for j in range(try_row + 1, len(lines)):
+        if lines[j].strip() and _indent(lines[j]) <= base:
+            end = j
+            break
+    lines[end:end] = [" " * base + "finally:", " " * (base + 4) + "pass"]
+    return "เติม 'finally: pass' ให้ try ที่ไม่มี except/finally"
+
+def _fix_print(lines, row):
+    line = lines[row]
+    indent = _indent(line)
+    if not _py2_print_re.match(line, indent):
+        return None
+    end = _code_end(line)
+    args = line[indent + 5:end].strip()
+    lines[row] = line[:indent] + f"print({args})" + line[end:]
+    return "แปลง print แบบ Python 2 เป็น print(...)"
+
+def _fix(lines, err):
+    """Apply one fix for `err` (raised by parsing `lines`). Returns (row, note) or None."""
+    row = getattr(err, "lineno", None)
+    msg = getattr(err, "msg", "")
+    if row is None or not lines:
+        return None
+    row = min(max(row, 1), len(lines)) - 1
+    col = max((err.offset or 1) - 1, 0)
+    note = None
+    m = _indented_block_re.match(msg)
+    if m:
+        header_row = int(m.group(1)) - 1
+        if 0 <= header_row < len(lines):
+            return header_row + 1, _insert_pass(lines, header_row, row)
+    elif msg == "expected ':'":
+        note = _insert_colon(lines, row, col)
+    elif (m := _never_closed_re.match(msg)) is not None:
+        note = _close_bracket(lines, row, m.group(1))
+    elif (m := _mismatch_re.match(msg)) is not None:
+        line = lines[row]
+        if line[col:col + 1] == m.group(1):
+            lines[row] = line[:col] + CLOSERS[m.group(2)] + line[col + 1:]
+            note = f"แก้วงเล็บปิด '{m.group(1)}' ให้ตรงกับ '{m.group(2)}'"
+    elif msg.startswith("unmatched "):
+        line = lines[row]
+        if line[col:col + 1] in ")]}":
+            lines[row] = line[:col] + line[col + 1:]
+            note = f"ลบวงเล็บปิด '{line[col]}' ที่เกิน"
+    elif msg.startswith("unterminated triple-quoted string"):
+        note = _close_string(lines, row, col, triple=True)
+    elif msg.startswith("unterminated string literal"):
+        note = _close_string(lines, row, col, triple=False)
+    elif msg == "unexpected indent":
+        note = _fix_unexpected_indent(lines, row)
+    elif msg.startswith("unindent does not match"):
+        note = _fix_unindent(lines, row)
+    elif msg == "expected 'except' or 'finally' block":
+        note = _fix_missing_handler(lines, row)
+    elif msg.startswith("Missing parentheses in call to 'print'"):
+        note = _fix_print(lines, row)
+    elif msg.startswith("invalid syntax") and _first_word(lines[row]) in HEADER_KEYWORDS \
+            and not lines[row][:_code_end(lines[row])].endswith(":"):
+        # `for i in x print(i)`: the parser stops where the ':' should have been
+        note = _insert_colon(lines, row, col)
+    return (row + 1, note) if note else None
+
+def repair_region(lines, max_passes=MAX_PASSES):
+    """Fix `lines` in place, reparsing only them, for at most `max_passes` fixes. Returns [(row, note)]."""
+    notes = []
+    for _ in range(max_passes):
+        err = _syntax_error(lines)
+        if err is None:
+            break
+        fixed = _fix(lines, err)
+        if fixed is None:
+            break
+        notes.append(fixed)
+    return notes
+
+def repair(code, max_passes=MAX_PASSES):
+    """
+    Repair `code` (already indentation-normalized). Returns (fixed_code, notes) where
+    notes is [(line, description)] with line numbers in the fixed code.
+    """
+    lines = code.splitlines()
+    err = _syntax_error(lines)
+    notes = []
+    if err is not None:
+        regions = split_regions(lines)
+        ends = [end for _, end in regions]
+        out = []
+        # parse runs of regions together; a clean run doubles the next one, a failing run is cut
+        # back to the regions before the reported error (tokenizer errors such as "too many
+        # nested parentheses" surface late, so that shorter run is parsed again, not trusted)
+        i, size = 0, 1
+        while i < len(regions):
+            j = min(len(regions), i + size)
+            run = lines[regions[i][0]:ends[j - 1]]
+            if j - i > 1:
+                run_err = _syntax_error(run)
+                if run_err is not None:
+                    row = regions[i][0] + (getattr(run_err, "lineno", None) or 1) - 1
+                    size = max(1, min(bisect.bisect_right(ends, row, i, j - 1), j - 1) - i)
+                    continue
+            if j - i == 1:
+                base = len(out)
+                notes.extend((base + row, note) for row, note in repair_region(run, max_passes))
+            out.extend(run)
+            i, size = j, size * 2
+        lines = out
+        # regions are cut heuristically; if the joined file still fails, repair it as a whole
+        notes.extend(repair_region(lines, max_passes))
+    fixed = "\n".join(lines)
+    if fixed and not fixed.endswith("\n"):
+        fixed += "\n"
+    return fixed, notes
@@ -0,0 +1,152 @@
+"""
+Headless batch mode: run the same checks as the Streamlit page over files, directories
+or globs, spread across a process pool, yielding one JSON-serializable record per file.
+The command line lives in error_helper.__main__.
+"""
+import functools
+import glob
+import os
+
+from error_helper.core import do_full_analysis
+from error_helper.pep8 import check_file, iter_pep8_issues
+
+_stores = {}  # cache path -> DiskCache, one per process
+
+SKIP_DIRS = {".git", "__pycache__", ".venv", "venv", ".tox", ".nox", "node_modules"}
+
+def iter_source_files(targets):
+    """Expand files, directories (recursively, *.py) and glob patterns into unique paths, in order."""
+    seen = set()
+    for target in targets:
+        if os.path.isdir(target):
+            candidates = []
+            for root, dirs, files in os.walk(target):
+                dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+                candidates.extend(os.path.join(root, f) for f in sorted(files) if f.endswith(".py"))
+        elif os.path.isfile(target):
+            candidates = [target]
+        else:
+            candidates = sorted(glob.glob(target, recursive=True))
+        for path in candidates:
+            if path not in seen and os.path.isfile(path):
+                seen.add(path)
+                yield path
+
+def _issue_records(issues):
+    return [{'line': ln, 'code': code_key, 'message': msg} for ln, code_key, msg in issues]
+
+def _store(cache_path):
+    store = _stores.get(cache_path)
+    if store is None:
+        from error_helper.diskcache import DiskCache
+        try:
+            store = DiskCache(cache_path)
+        except OSError:
+            store = False  # unwritable location: run uncached rather than fail every file
+        _stores[cache_path] = store
+    return store or None
+
+def analyze_file(path, max_line_len=79, explain=False, fix=False, pep8_only=False, cache_path=None, rules=None,
+                 compute=None, changed=None, source=None):
+    """
+    Analyze one file and return a JSON-serializable record (never raises).
+    pep8_only streams the file through the token-based checker without loading it,
+    for generated/vendored files too large to hold in memory.
+    cache_path names a DiskCache file shared with other workers and the Streamlit page.
+    rules is the frozenset of enabled rule ids (None = defaults, see error_helper.rules).
+    compute replaces do_full_analysis (e.g. error_helper.shard.analyze_sharded).
+    changed ([(first, last)] line ranges) reports only on those lines (error_helper.gitdiff).
+    source is the text to analyze instead of the file's (e.g. its staged version).
+    """
+    record = {'path': path}
+    if pep8_only:
+        try:
+            issues = check_file(path, max_line=max_line_len, rules=rules) if source is None else \
+                iter_pep8_issues(source, max_line=max_line_len, rules=rules)
+            record['pep8_issues'] = _issue_records(issues)
+        except OSError as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+        return record
+    code = source
+    if code is None:
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                code = f.read()
+        except OSError as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+            return record
+    store = _store(cache_path) if cache_path else None
+    if changed is not None:
+        from error_helper.gitdiff import analyze_changed
+        result = analyze_changed(code, changed, max_line_len=max_line_len, rules=rules)
+        record['changed_lines'] = [list(r) for r in changed]
+    elif store is not None:
+        result = store.analyze(code, max_line_len=max_line_len, rules=rules, compute=compute)
+    else:
+        result = (compute or do_full_analysis)(code, max_line_len=max_line_len, rules=rules)
+    record['syntax_error'] = result['syntax_error']
+    if 'auto_fix_success' in result:
+        record['auto_fix_success'] = result['auto_fix_success']
+        if fix:
+            record['auto_fixed'] = result['auto_fixed_attempt']
+            record['auto_fix_notes'] = [{'line': ln, 'text': text} for ln, text in result['auto_fix_notes']]
+    record['pep8_issues'] = _issue_records(result['pep8_issues'])
+    record['performance_hints'] = result['performance_hints']
+    record['complexity'] = [{'line': ln, 'function': name, 'estimate': estimate}
+                            for ln, name, estimate in result['complexity']]
+    record['structure_suggestions'] = result['structure_suggestions']
+    if explain:
+        record['explanations'] = [{'line': ln, 'text': text} for ln, text in result['explanations']]
+    return record
+
+def _analyze_job(job):
+    path, options = job
+    return analyze_file(path, **options)
+
+def analyze_paths(targets, jobs=None, chunksize=None, max_line_len=79, explain=False, fix=False, pep8_only=False,
+                  cache_path=None, rules=None, shard=False, changed=None, sources=None):
+    """
+    Yield one record per file as soon as it is finished (completion order, not input order).
+    jobs=1 runs in-process; otherwise files are handed to a process pool in chunks.
+    shard=True goes through the files one at a time instead, each large one split across
+    the pool (error_helper.shard): for a few very large files rather than many small ones.
+    changed ({real path: [(first, last)]}, see error_helper.gitdiff) limits the run to
+    those files and reports only on their changed lines; sources ({real path: text}, e.g.
+    from error_helper.gitdiff.git_staged) is then analyzed instead of those files on disk.
+    """
+    files = list(iter_source_files(targets))
+    options = {'max_line_len': max_line_len, 'explain': explain, 'fix': fix, 'pep8_only': pep8_only,
+               'cache_path': cache_path, 'rules': rules}
+    if changed is not None:
+        ranges = {path: changed.get(os.path.realpath(path)) for path in files}
+        files = [path for path in files if ranges[path]]
+        jobs = jobs or 1  # a diff is usually a few files: a pool would cost more than it saves
+        jobs_options = [(path, dict(options, changed=ranges[path],
+                                    source=(sources or {}).get(os.path.realpath(path)))) for path in files]
+        if jobs == 1 or len(files) <= 1:
+            for job in jobs_options:
+                yield _analyze_job(job)
+            return
+        from multiprocessing import Pool
+        with Pool(processes=min(jobs, len(files))) as pool:
+            yield from pool.imap_unordered(_analyze_job, jobs_options)
+        return
+    jobs = jobs or os.cpu_count() or 1
+    if shard and jobs > 1 and not pep8_only:
+        from multiprocessing import Pool
+        from error_helper.shard import analyze_sharded
+        with Pool(processes=jobs) as pool:
+            compute = functools.partial(analyze_sharded, jobs=jobs, pool=pool)
+            for path in files:
+                yield analyze_file(path, compute=compute, **options)
+        return
+    if jobs == 1 or len(files) <= 1:
+        for path in files:
+            yield analyze_file(path, **options)
+        return
+    if chunksize is None:
+        # a few chunks per worker: amortizes IPC while keeping the tail balanced
+        chunksize = max(1, len(files) // (jobs * 4))
+    from multiprocessing import Pool  # only the parent needs the pool machinery
+    with Pool(processes=min(jobs, len(files))) as pool:
+        yield from pool.imap_unordered(_analyze_job, ((p, options) for p in files), chunksize=chunksize)
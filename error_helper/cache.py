@@ -0,0 +1,119 @@
+"""
+In-process LRU cache of do_full_analysis results, shared by reruns, sessions and threads,
+optionally backed by a persistent store (error_helper.diskcache) shared across processes.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from error_helper.core import ANALYZER_VERSION, do_full_analysis
+from error_helper.instrument import stage
+from error_helper.rules import selection_key
+
+def _result_size(result):
+    """Approximate memory footprint of an analysis result (characters of text held)."""
+    size = 0
+    for value in result.values():
+        if isinstance(value, str):
+            size += len(value)
+        elif isinstance(value, list):
+            size += sum(len(str(item)) for item in value)
+    return size
+
+def result_key(code, max_line_len=79, rules=None):
+    """Cache key of a do_full_analysis result: a hash of (ANALYZER_VERSION, max_line_len, rule selection, code)."""
+    h = hashlib.sha256(f"{ANALYZER_VERSION}\0{max_line_len}\0{selection_key(rules)}\0".encode("utf-8"))
+    h.update(code.encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+class AnalysisCache:
+    """
+    Thread-safe in-process LRU cache of do_full_analysis results, keyed by a hash of
+    (ANALYZER_VERSION, max_line_len, code). Bounded by entry count and approximate size.
+    `compute` is called on a miss; it must return what do_full_analysis would.
+    `store` (a DiskCache) is consulted on a miss before computing, and receives new results.
+    """
+    def __init__(self, max_entries=256, max_size=64 * 1024 * 1024, compute=do_full_analysis, store=None):
+        self.compute = compute
+        self.store = store
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(code, max_line_len=79, rules=None):
+        return result_key(code, max_line_len, rules)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, result):
+        size = _result_size(result)
+        if size > self.max_size:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (result, size)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_size:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def invalidate(self, key=None):
+        """Drop one entry (by key) or, with no key, the whole cache (and the store's)."""
+        if self.store is not None:
+            self.store.invalidate(key)
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._size = 0
+            else:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._size -= old[1]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'size': self._size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def analyze(self, code, max_line_len=79, rules=None, **options):
+        """
+        do_full_analysis with caching. Returns a shallow copy; treat the lists as read-only.
+        `options` go to `compute` only; results marked `incomplete` are not stored.
+        """
+        with stage("cache.lookup"):
+            key = self.make_key(code, max_line_len, rules)
+            result = self.get(key)
+        if result is None and self.store is not None:
+            with stage("cache.disk"):
+                result = self.store.get(key)
+            if result is not None:
+                self.put(key, result)
+        if result is None:
+            result = self.compute(code, max_line_len=max_line_len, rules=rules, **options)
+            if not result.get('incomplete'):
+                self.put(key, result)
+                if self.store is not None:
+                    with stage("cache.disk"):
+                        self.store.put(key, result)
+        return dict(result)
@@ -0,0 +1,143 @@
+"""
+Module call graph and recursion detection.
+
+PerformanceAnalyzer collects, in one walk, every function definition (where it is
+defined, its enclosing function, the class its `self` refers to) and every call made
+inside a function by name (`f()`, `self.m()`, `Cls.m()`). Calls are resolved here the
+way Python scoping would resolve them statically: enclosing functions first, then the
+module; `self.`/`cls.` through the class and its bases defined in the same module.
+Strongly connected components of the resulting graph are the recursion: a component
+with a self-loop is direct recursion, a larger one is mutual recursion. Everything is
+linear in functions + calls.
+"""
+from collections import deque
+
+MODULE = ('m',)
+
+def resolve_calls(functions, classes, calls):
+    """
+    Adjacency lists (callee ids per function id).
+    functions: [(qualname, owner, parent_fn, receiver, lineno)] where owner is MODULE, ('f', id)
+               or ('c', class_qualname) and receiver is (class_qualname, first_param) or None
+    classes:   {class_qualname: [base names]}
+    calls:     [(caller_id, name, attr)]: `name(...)` when attr is None, else `name.attr(...)`
+    """
+    defs = {}
+    for i, (qualname, owner, *_) in enumerate(functions):
+        # a later definition of the same name wins, as it would at call time
+        defs[owner + (qualname.rsplit(".", 1)[-1],)] = i
+    method_cache = {}
+
+    def lookup_method(class_q, attr):
+        key = (class_q, attr)
+        if key not in method_cache:
+            found = None
+            seen = {class_q}
+            queue = deque([class_q])
+            while queue:
+                cls = queue.popleft()
+                found = defs.get(('c', cls, attr))
+                if found is not None:
+                    break
+                for base in classes.get(cls, ()):
+                    if base not in seen:
+                        seen.add(base)
+                        queue.append(base)
+            method_cache[key] = found
+        return method_cache[key]
+
+    edges = [[] for _ in functions]
+    seen_edges = set()
+    for caller, name, attr in calls:
+        callee = None
+        if attr is None:
+            scope = caller
+            while scope is not None and callee is None:
+                callee = defs.get(('f', scope, name))
+                scope = functions[scope][2]
+            if callee is None:
+                callee = defs.get(MODULE + (name,))
+        else:
+            receiver = functions[caller][3]
+            if receiver is not None and receiver[1] == name:
+                callee = lookup_method(receiver[0], attr)
+            elif name in classes:
+                callee = lookup_method(name, attr)
+        if callee is not None and (caller, callee) not in seen_edges:
+            seen_edges.add((caller, callee))
+            edges[caller].append(callee)
+    return edges
+
+def strongly_connected_components(edges):
+    """Tarjan's algorithm, iterative (no recursion limit on deep call chains)."""
+    n = len(edges)
+    index = [None] * n
+    low = [0] * n
+    on_stack = [False] * n
+    stack = []
+    components = []
+    counter = 0
+    for root in range(n):
+        if index[root] is not None:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, 0)]
+        while work:
+            v, i = work[-1]
+            if i < len(edges[v]):
+                work[-1] = (v, i + 1)
+                w = edges[v][i]
+                if index[w] is None:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack[w] = True
+                    work.append((w, 0))
+                elif on_stack[w]:
+                    low[v] = min(low[v], index[w])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[v])
+            if low[v] == index[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack[w] = False
+                    component.append(w)
+                    if w == v:
+                        break
+                components.append(component)
+    return components
+
+def _shortest_cycle(edges, start, members):
+    # BFS from `start` inside its component until an edge leads back to it
+    parent = {start: None}
+    queue = deque([start])
+    while queue:
+        v = queue.popleft()
+        for w in edges[v]:
+            if w == start:
+                path = [v]
+                while parent[path[-1]] is not None:
+                    path.append(parent[path[-1]])
+                return path[::-1]
+            if w in members and w not in parent:
+                parent[w] = v
+                queue.append(w)
+    return [start]
+
+def recursive_cycles(edges):
+    """[(cycle path of ids starting at the component's first function, component size)], in source order."""
+    cycles = []
+    for component in strongly_connected_components(edges):
+        start = min(component)
+        if len(component) == 1 and start not in edges[start]:
+            continue
+        cycles.append((_shortest_cycle(edges, start, set(component)), len(component)))
+    cycles.sort(key=lambda item: item[0][0])
+    return cycles
@@ -0,0 +1,238 @@
+"""
+Cost model and light type inference for the performance analyzer.
+
+A cost is a pair (k, m) meaning O(n^k · log^m n); costs add along nested loops and
+compare as tuples. Each loop contributes the cost of what it iterates: a constant
+`range(10)` or a short literal like `(a, b)` is O(1), anything else counts as O(n).
+
+Kinds ('list', 'str', 'set', 'dict', 'tuple', 'deque', 'num') are inferred from
+literals, well-known constructors and methods, and annotations; anything else is None
+(unknown). Inference is deliberately local and flow-insensitive: the analyzer records
+the kind of the last assignment seen in a scope, in source order.
+"""
+import ast
+
+CONSTANT = (0, 0)
+LINEAR = (1, 0)
+N_LOG_N = (1, 1)
+QUADRATIC = (2, 0)
+
+COMPREHENSION_NODES = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+# a literal this small is iterated in constant time
+SMALL_LITERAL = 16
+# kind of a name bound to a small list of constants: `in` on it is cheap until it grows
+LITERAL_LIST = "literal-list"
+
+_SUPERSCRIPTS = str.maketrans("0123456789", "⁰¹²³⁴⁵⁶⁷⁸⁹")
+
+def add(a, b):
+    return (a[0] + b[0], a[1] + b[1])
+
+def label(cost):
+    """O(...) text for a cost: O(1), O(n), O(n²), O(n log n), O(n² log n), ..."""
+    k, m = cost
+    if not k and not m:
+        return "O(1)"
+    parts = []
+    if k:
+        parts.append("n" if k == 1 else "n" + str(k).translate(_SUPERSCRIPTS))
+    if m:
+        parts.append("log n" if m == 1 else f"log{str(m).translate(_SUPERSCRIPTS)} n")
+    return f"O({' '.join(parts)})"
+
+# -----------------------
+# Iteration cost
+# -----------------------
+# builtins whose iteration cost is that of their (first) iterable argument
+_PASS_THROUGH = frozenset({"enumerate", "zip", "reversed", "sorted", "list", "tuple", "set", "frozenset",
+                           "iter", "filter", "map"})
+
+def _is_small_literal(node):
+    if isinstance(node, ast.Constant):
+        return True
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return len(node.elts) <= SMALL_LITERAL and not any(isinstance(e, ast.Starred) for e in node.elts)
+    return False
+
+def iteration_cost(node):
+    """Cost of one pass over the iterable expression `node`."""
+    if _is_small_literal(node):
+        return CONSTANT
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        name = node.func.id
+        if name == "range":
+            return CONSTANT if node.args and all(isinstance(a, ast.Constant) for a in node.args) else LINEAR
+        if name in _PASS_THROUGH and node.args:
+            # zip/map over several iterables: the longest (costliest) one decides
+            return max(iteration_cost(a) for a in (node.args[1:] if name in ("filter", "map") else node.args))
+    return LINEAR
+
+def loop_cost(node):
+    """Cost one run of the loop `node` adds to its body (For, While or a comprehension)."""
+    if isinstance(node, (ast.For, ast.AsyncFor)):
+        return iteration_cost(node.iter)
+    if isinstance(node, COMPREHENSION_NODES):
+        cost = CONSTANT
+        for gen in node.generators:
+            cost = add(cost, iteration_cost(gen.iter))
+        return cost
+    return LINEAR  # while: unknown trip count
+
+def within(node, outer):
+    """True if `node`'s source span lies inside `outer`'s."""
+    return ((outer.lineno, outer.col_offset) <= (node.lineno, node.col_offset)
+            and (node.end_lineno, node.end_col_offset) <= (outer.end_lineno, outer.end_col_offset))
+
+def repeats(loop, node):
+    """True if `node`, somewhere inside `loop`, runs once per iteration (not in a for-iterable evaluated once)."""
+    if isinstance(loop, (ast.For, ast.AsyncFor)):
+        return not within(node, loop.iter)
+    if isinstance(loop, COMPREHENSION_NODES):
+        return not within(node, loop.generators[0].iter)
+    return True  # a while test is evaluated every time round
+
+# -----------------------
+# Kinds
+# -----------------------
+_CONSTRUCTORS = {
+    "list": "list", "sorted": "list", "str": "str", "repr": "str", "chr": "str", "format": "str",
+    "set": "set", "frozenset": "set", "dict": "dict", "tuple": "tuple", "deque": "deque",
+    "int": "num", "float": "num", "len": "num", "sum": "num", "ord": "num", "abs": "num", "round": "num",
+}
+_STR_METHODS = frozenset({
+    "join", "format", "strip", "lstrip", "rstrip", "lower", "upper", "title", "capitalize", "replace",
+    "ljust", "rjust", "center", "zfill", "casefold", "expandtabs", "removeprefix", "removesuffix",
+})
+_LIST_METHODS = frozenset({"split", "rsplit", "splitlines", "readlines"})
+_ANNOTATIONS = {
+    "list": "list", "List": "list", "str": "str", "set": "set", "Set": "set", "frozenset": "set",
+    "FrozenSet": "set", "dict": "dict", "Dict": "dict", "tuple": "tuple", "Tuple": "tuple",
+    "deque": "deque", "Deque": "deque", "int": "num", "float": "num",
+}
+
+def annotation_kind(node):
+    """Kind named by an annotation (`list`, `List[int]`, `typing.Deque[str]`, ...), or None."""
+    if isinstance(node, ast.Subscript):
+        node = node.value
+    if isinstance(node, ast.Attribute):
+        return _ANNOTATIONS.get(node.attr)
+    if isinstance(node, ast.Name):
+        return _ANNOTATIONS.get(node.id)
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):  # "list[int]" forward reference
+        return _ANNOTATIONS.get(node.value.split("[", 1)[0].rsplit(".", 1)[-1])
+    return None
+
+def is_constant_list(node):
+    """A list display of at most SMALL_LITERAL constants, e.g. [1, 2, 3]."""
+    return isinstance(node, ast.List) and 0 < len(node.elts) <= SMALL_LITERAL \
+        and all(isinstance(e, ast.Constant) for e in node.elts)
+
+_GROW_METHODS = frozenset({"append", "extend", "insert"})
+
+def grown_names(node):
+    """Names that `node` may grow or rebind: x.append/extend/insert(...), x += ..., x = ..., x[...] = ..."""
+    names = set()
+    for inner in ast.walk(node):
+        if isinstance(inner, ast.Call) and isinstance(inner.func, ast.Attribute) \
+                and inner.func.attr in _GROW_METHODS and isinstance(inner.func.value, ast.Name):
+            names.add(inner.func.value.id)
+        elif isinstance(inner, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            for target in (inner.targets if isinstance(inner, ast.Assign) else [inner.target]):
+                if isinstance(target, ast.Subscript):
+                    target = target.value
+                if isinstance(target, ast.Name):
+                    names.add(target.id)
+    return names
+
+def expr_kind(node, lookup):
+    """Kind of the value of `node`; `lookup(name)` gives the inferred kind of a variable."""
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, str):
+            return "str"
+        if isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return "num"
+        return None
+    if isinstance(node, ast.JoinedStr):
+        return "str"
+    if isinstance(node, (ast.List, ast.ListComp)):
+        return "list"
+    if isinstance(node, ast.Tuple):
+        return "tuple"
+    if isinstance(node, (ast.Set, ast.SetComp)):
+        return "set"
+    if isinstance(node, (ast.Dict, ast.DictComp)):
+        return "dict"
+    if isinstance(node, ast.Name):
+        return lookup(node.id)
+    if isinstance(node, ast.Call):
+        func = node.func
+        if isinstance(func, ast.Name):
+            return _CONSTRUCTORS.get(func.id)
+        if isinstance(func, ast.Attribute):
+            if func.attr == "deque":
+                return "deque"
+            if func.attr in _STR_METHODS:
+                return "str"
+            if func.attr in _LIST_METHODS:
+                return "list"
+        return None
+    if isinstance(node, ast.BinOp):
+        left, right = (_list_kind(expr_kind(side, lookup)) for side in (node.left, node.right))
+        if isinstance(node.op, ast.Add):
+            return left if left == right or right is None else (right if left is None else None)
+        if isinstance(node.op, ast.Mod) and left == "str":
+            return "str"
+        if isinstance(node.op, ast.Mult):
+            return left if left in ("str", "list") else (right if right in ("str", "list") else None)
+    return None
+
+def _list_kind(kind):
+    return "list" if kind == LITERAL_LIST else kind
+
+# -----------------------
+# Calls
+# -----------------------
+# side-effect-free builtins (and re.compile) with the cost of one call on an n-sized argument
+PURE_CALLS = {
+    "len": CONSTANT, "abs": CONSTANT, "sorted": N_LOG_N, "sum": LINEAR, "min": LINEAR, "max": LINEAR,
+    "any": LINEAR, "all": LINEAR, "set": LINEAR, "frozenset": LINEAR, "list": LINEAR, "tuple": LINEAR,
+    "dict": LINEAR, "re.compile": CONSTANT,
+}
+# methods whose cost grows with the size of the receiver
+_METHOD_COSTS = {"sort": N_LOG_N, "index": LINEAR, "count": LINEAR, "remove": LINEAR}
+
+def dotted(node):
+    """'a.b.c' for a Name/Attribute chain, else None."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+def root_name(node):
+    """The variable at the base of `a.b[i].c(...)`, or None."""
+    while isinstance(node, (ast.Attribute, ast.Subscript, ast.Call, ast.Starred)):
+        node = node.func if isinstance(node, ast.Call) else node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+def pure_call_cost(node):
+    """Cost of the call `node` if it is to a side-effect-free builtin, else None."""
+    name = dotted(node.func)
+    cost = PURE_CALLS.get(name)
+    if cost is None or node.keywords and name not in ("sorted", "min", "max", "dict"):
+        return None
+    if name in ("min", "max") and len(node.args) > 1:
+        return CONSTANT
+    return cost if node.args or node.keywords else CONSTANT
+
+def call_cost(node):
+    """Estimated cost of one call `node` (O(1) unless it is a known O(n)/O(n log n) builtin or method)."""
+    cost = pure_call_cost(node)
+    if cost is not None:
+        return cost
+    if isinstance(node.func, ast.Attribute):
+        return _METHOD_COSTS.get(node.func.attr, CONSTANT)
+    return CONSTANT
@@ -0,0 +1,1060 @@
+"""
+Analysis core of the Error Helper: parsing, auto-fix, the single-pass analysis engine
+and the analyzers. No Streamlit import and only `ast`/`re` at import time — the UI,
+the batch CLI and pool workers all build on this module, and workers pay its import
+cost on every spawn (see error_helper.startup).
+"""
+import ast
+import re
+from collections import defaultdict
+
+from error_helper.autofix import repair
+from error_helper.callgraph import MODULE, recursive_cycles, resolve_calls
+from error_helper.complexity import (
+    COMPREHENSION_NODES,
+    CONSTANT,
+    LINEAR,
+    LITERAL_LIST,
+    QUADRATIC,
+    add,
+    annotation_kind,
+    call_cost,
+    dotted,
+    expr_kind,
+    grown_names,
+    is_constant_list,
+    label,
+    loop_cost,
+    pure_call_cost,
+    repeats,
+    root_name,
+)
+from error_helper.instrument import current as current_recorder, stage
+from error_helper.pep8 import pep8_checks
+from error_helper.rules import define_rule, handlers, handles, plugin_rules, resolve
+from error_helper.source import SourceIndex
+
+# bump whenever an analyzer's output changes, so stale cached results are never served
+ANALYZER_VERSION = "10"
+
+# -----------------------
+# Helpers: safety & utils
+# -----------------------
+PY_KEYWORDS = {
+    "False","None","True","and","as","assert","async","await","break","class","continue","def","del","elif","else",
+    "except","finally","for","from","global","if","import","in","is","lambda","nonlocal","not","or","pass","raise",
+    "return","try","while","with","yield"
+}
+
+identifier_re = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+def safe_parse(code):
+    """Attempt to parse code into AST. Return (tree, error_message)."""
+    try:
+        tree = ast.parse(code)
+        return tree, None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+def normalize_indentation(code):
+    # replace tabs with 4 spaces and remove trailing spaces
+    lines = code.splitlines()
+    new = []
+    for ln in lines:
+        ln2 = ln.replace("\t", "    ").rstrip()
+        new.append(ln2)
+    return "\n".join(new) + ("\n" if code and not code.endswith("\n") else "")
+
+def simple_auto_fix(code):
+    """
+    Conservative automatic fixes driven by where the parser fails (see error_helper.autofix):
+    - normalize indentation (tabs -> 4 spaces)
+    - missing ':' after def/class/if/for/while/..., empty blocks get 'pass'
+    - unclosed/stray brackets, unterminated strings, bad indents, try without handler
+    - ensure trailing newline
+    Note: this won't attempt dangerous or ambiguous fixes.
+    """
+    return repair(normalize_indentation(code))[0]
+
+def attempt_unparse(tree):
+    """Try to generate normalized code from AST. Fall back to None if not available."""
+    try:
+        # ast.unparse available in Python 3.9+
+        return ast.unparse(tree)
+    except Exception:
+        return None
+
+def dump_ast(tree, max_nodes=20000):
+    """
+    ast.dump(indent=2) of the top-level statements that fit in `max_nodes` nodes in total.
+    Returns (text, complete); building the dump of a huge tree can take seconds and
+    hundreds of MB, so larger trees are cut rather than dumped whole.
+    """
+    parts = []
+    budget = max_nodes
+    body = getattr(tree, 'body', [tree])
+    for node in body:
+        size = 0
+        for _ in ast.walk(node):
+            size += 1
+            if size > budget:
+                return "\n".join(parts), False
+        budget -= size
+        try:
+            parts.append(ast.dump(node, include_attributes=True, indent=2))
+        except RecursionError:
+            return "\n".join(parts), False
+    return "\n".join(parts), True
+
+# -----------------------
+# Analysis engine (parse once, walk once)
+# -----------------------
+LOOP_NODES = (ast.For, ast.AsyncFor, ast.While)
+FUNCTION_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+SCOPE_NODES = FUNCTION_NODES + (ast.ClassDef,)
+
+class WalkContext:
+    """
+    State visible to callbacks during a walk: loop depth, enclosing functions and def/class
+    scopes, and enclosing loops (comprehensions included, which loop_depth does not count).
+    """
+    def __init__(self):
+        self.loop_depth = 0
+        self.functions = []
+        self.scopes = []
+        self.loops = []
+
+class AnalysisEngine:
+    """
+    Single-pass AST traversal. Analyzers register callbacks per node type with `on()`;
+    `run()` walks the tree once (iteratively, depth-first, source order) and calls every
+    callback registered for the node's type, from a node class -> callbacks table built
+    on first sight of each class. Cost: O(nodes) + O(matching callbacks).
+    """
+    def __init__(self):
+        self._handlers = []
+        self._dispatch = {}
+        # name charged for callbacks registered next (see run_analyzers); used by instrumentation
+        self.owner = "engine"
+
+    def on(self, node_types, callback):
+        self._handlers.append((node_types, callback, self.owner))
+        self._dispatch.clear()
+
+    def _callbacks_for(self, cls):
+        callbacks = self._dispatch.get(cls)
+        if callbacks is None:
+            callbacks = [cb for types, cb, _ in self._handlers if issubclass(cls, types)]
+            self._dispatch[cls] = callbacks
+        return callbacks
+
+    def run(self, tree):
+        rec = current_recorder()
+        if rec is None:
+            return self._walk(tree)
+        # instrumented run: charge every callback's time to its analyzer
+        saved = self._handlers, self._dispatch
+        self._handlers = [(types, _timed(cb, rec, f"walk.{owner}"), owner) for types, cb, owner in self._handlers]
+        self._dispatch = {}
+        try:
+            with rec.stage("walk"):
+                return self._walk(tree)
+        finally:
+            self._handlers, self._dispatch = saved
+
+    def _walk(self, tree):
+        ctx = WalkContext()
+        stack = [(tree, False)]
+        while stack:
+            node, leaving = stack.pop()
+            if leaving:
+                if isinstance(node, LOOP_NODES):
+                    ctx.loop_depth -= 1
+                    ctx.loops.pop()
+                elif isinstance(node, COMPREHENSION_NODES):
+                    ctx.loops.pop()
+                else:
+                    ctx.scopes.pop()
+                    if isinstance(node, FUNCTION_NODES):
+                        ctx.functions.pop()
+                continue
+            # loop depth / function and scope stacks include the node itself while its callbacks run
+            if isinstance(node, LOOP_NODES):
+                ctx.loop_depth += 1
+                ctx.loops.append(node)
+                stack.append((node, True))
+            elif isinstance(node, COMPREHENSION_NODES):
+                ctx.loops.append(node)
+                stack.append((node, True))
+            elif isinstance(node, SCOPE_NODES):
+                ctx.scopes.append(node)
+                if isinstance(node, FUNCTION_NODES):
+                    ctx.functions.append(node)
+                stack.append((node, True))
+            for cb in self._callbacks_for(type(node)):
+                cb(node, ctx)
+            children = list(ast.iter_child_nodes(node))
+            for child in reversed(children):
+                stack.append((child, False))
+        return ctx
+
+def _timed(callback, rec, name):
+    import time
+
+    def timed(node, ctx):
+        t = time.perf_counter()
+        callback(node, ctx)
+        rec.count(name, time.perf_counter() - t)
+    return timed
+
+def _plugin(callback, report):
+    def run(node, ctx):
+        callback(node, ctx, report)
+    return run
+
+def register_rules(analyzer, engine):
+    """
+    Register the handlers of the analyzer's enabled rules (see error_helper.rules), and the
+    enabled plugin rules of its group, each charged to its rule id when instrumented.
+    """
+    for rule_ids, node_types, name in handlers(type(analyzer)):
+        enabled = [rule_id for rule_id in rule_ids if rule_id in analyzer.enabled]
+        if enabled:
+            # bookkeeping shared by several rules is charged to the group
+            engine.owner = enabled[0] if len(rule_ids) == 1 else f"{analyzer.group}.shared"
+            engine.on(node_types, getattr(analyzer, name))
+    for rule in plugin_rules(analyzer.group, analyzer.enabled):
+        engine.owner = rule.id
+        engine.on(rule.nodes, _plugin(rule.callback, analyzer.report))
+
+def run_analyzers(tree, analyzers):
+    """Register every analyzer on one engine and walk `tree` once."""
+    engine = AnalysisEngine()
+    for analyzer in analyzers:
+        engine.owner = type(analyzer).__name__
+        analyzer.register(engine)
+    engine.run(tree)
+    return analyzers
+
+# -----------------------
+# Analyzers
+# -----------------------
+define_rule("explain.assign", "อธิบายการกำหนดค่าตัวแปร")
+define_rule("explain.function", "อธิบายการประกาศฟังก์ชัน")
+define_rule("explain.if", "อธิบาย if")
+define_rule("explain.for", "อธิบาย for loop")
+define_rule("explain.while", "อธิบาย while loop")
+define_rule("explain.import", "อธิบาย import")
+define_rule("explain.return", "อธิบาย return")
+define_rule("explain.call", "อธิบายการเรียกฟังก์ชัน/เมธอด")
+
+class ExplainAnalyzer:
+    """Map statements/calls to short per-line explanations, quoting `source` (a SourceIndex)."""
+    group = "explain"
+
+    def __init__(self, source, rules=None):
+        self.source = source
+        self.enabled = resolve(rules)
+        self.explanations = defaultdict(list)
+
+    def register(self, engine):
+        register_rules(self, engine)
+
+    def add(self, node, text):
+        self.explanations[node.lineno].append(text)
+
+    def report(self, lineno, text):
+        self.explanations[lineno].append(text)
+
+    @handles("explain.assign", ast.Assign)
+    def visit_assign(self, node, ctx):
+        # simplistic: describe assignment
+        targets = [self.source.fragment(t, "variable") for t in node.targets]
+        val = self.source.fragment(node.value, type(node.value).__name__)
+        self.add(node, f"กำหนดตัวแปร {' ,'.join(targets)} = {val}")
+
+    @handles("explain.function", ast.FunctionDef)
+    def visit_function(self, node, ctx):
+        args = [a.arg for a in node.args.args]
+        self.add(node, f"ประกาศฟังก์ชัน `{node.name}({', '.join(args)})`")
+
+    @handles("explain.if", ast.If)
+    def visit_if(self, node, ctx):
+        self.add(node, "เงื่อนไข `if` ถูกใช้เพื่อตรวจสอบค่าบางอย่าง")
+
+    @handles("explain.for", ast.For)
+    def visit_for(self, node, ctx):
+        self.add(node, "วนลูป `for` เพื่อทำซ้ำค่าหลาย ๆ ค่า")
+
+    @handles("explain.while", ast.While)
+    def visit_while(self, node, ctx):
+        self.add(node, "วนลูป `while` (เงื่อนไขเป็นตัวกำหนดการหยุด)")
+
+    @handles("explain.import", ast.Import)
+    def visit_import(self, node, ctx):
+        names = [alias.name for alias in node.names]
+        self.add(node, f"นำเข้าโมดูล: {', '.join(names)}")
+
+    @handles("explain.import", ast.ImportFrom)
+    def visit_import_from(self, node, ctx):
+        names = [alias.name for alias in node.names]
+        self.add(node, f"นำเข้า {', '.join(names)} จาก `{node.module or ''}`")
+
+    @handles("explain.return", ast.Return)
+    def visit_return(self, node, ctx):
+        self.add(node, "คืนค่าจากฟังก์ชัน (return)")
+
+    @handles("explain.call", ast.Call)
+    def visit_call(self, node, ctx):
+        funcname = self.source.fragment(node.func, "call")
+        self.add(node, f"เรียกใช้งานฟังก์ชัน/เมธอด `{funcname}`")
+
+    def results(self):
+        # convert to sorted list by line
+        out = []
+        for lineno in sorted(self.explanations.keys()):
+            for text in self.explanations[lineno]:
+                out.append((lineno, text))
+        return out
+
+define_rule("perf.nested-loops", "nested loop ลึกตั้งแต่ 3 ชั้น")
+define_rule("perf.append-in-loop", "append ใน loop")
+define_rule("perf.recursion", "recursion ทั้งเรียกตัวเองและเรียกกันเป็นวง (call graph)")
+define_rule("perf.concat-in-loop", "ต่อ string ด้วย += ใน loop (เฉพาะตัวแปรที่อนุมานได้ว่าเป็น str)")
+define_rule("perf.complexity", "ประมาณ Big-O ของแต่ละฟังก์ชันจาก loop ที่ซ้อนกัน")
+define_rule("perf.membership-in-loop", "`x in list` ภายใน loop")
+define_rule("perf.pop-front", "list.pop(0) / insert(0, x) ภายใน loop")
+define_rule("perf.loop-invariant", "งานที่ได้ค่าเดิมทุกรอบ ย้ายออกนอก loop ได้")
+define_rule("perf.hot-lookups", "อ่าน attribute/global ซ้ำใน loop")
+
+# rules that need the loop costs, and the ones that need inferred kinds
+LOOP_RULES = ("perf.complexity", "perf.append-in-loop", "perf.concat-in-loop", "perf.membership-in-loop",
+              "perf.pop-front", "perf.loop-invariant", "perf.hot-lookups")
+KIND_RULES = ("perf.concat-in-loop", "perf.membership-in-loop", "perf.pop-front")
+# tie-breakers between findings of the same estimated cost
+PERF_WEIGHTS = {
+    'nested': 5, 'complexity': 4, 'membership': 3, 'pop-front': 3, 'recursion': 3,
+    'concat': 2, 'hoist': 2, 'lookups': 1, 'append': 1, 'plugin': 1,
+}
+# attribute/global lookups per loop body before binding them to a local is worth suggesting
+LOOKUP_THRESHOLD = 3
+MODULE_NAME = "<module>"
+
+class PerformanceAnalyzer:
+    """
+    Static performance heuristics, ranked by estimated cost (see error_helper.complexity):
+    per-function loop complexity, nested loops, `x in list` / `pop(0)` / invariant work /
+    repeated lookups in loops, append and string += in loops, recursion (via the call graph).
+    `source` (a SourceIndex) is only needed when walking, not when merging precomputed data.
+    `module_kinds` ({name: kind}) are inferred kinds of module globals assigned before the
+    code walked (see error_helper.incremental).
+    """
+    group = "perf"
+
+    def __init__(self, source=None, rules=None, module_kinds=None):
+        self.source = source
+        self.enabled = resolve(rules)
+        self.max_depth = 0
+        self.max_depth_line = None  # the first loop at max_depth
+        # (lineno, cost, kind, detail); line numbers inside `detail` are offsets from lineno
+        self.findings = []
+        # (lineno, qualname, cost, line of its costliest operation) per function with loops;
+        # module-level code as [cost, line of its costliest operation]
+        self.complexity = []
+        self.module_cost = None
+        # call graph input, see error_helper.callgraph.resolve_calls
+        self.functions = []
+        self.classes = {}
+        self.calls = []
+        self._ids = {}
+        self._qualnames = {}
+        # walk state, turned into findings by _finish()
+        self._loops = {}                  # loop -> (function or None, cost inside it, enclosing loop)
+        self._fn_cost = {}                # function or None -> [cost, line of its costliest operation]
+        self._kinds = {(None, name): kind for name, kind in (module_kinds or {}).items()}
+        self._module_bound = set()        # globals assigned in the code walked
+        self.kind_deps = {}               # globals whose kind came from before it: name -> kind
+        self._locals = defaultdict(set)   # function -> names bound in it
+        self._fn_parent = {}
+        self._rebound = defaultdict(set)  # loop -> names and attribute chains assigned in it
+        self._mutated = defaultdict(set)  # loop -> variables possibly changed in it (calls, item stores)
+        self._grown = {}                  # outermost loop -> grown_names() of it
+        self._lookups = defaultdict(dict)  # loop -> {(kind, name): [occurrences, lookups each]}
+        self._hoist = []
+        self._inner = set()                # ids of nodes already covered by an enclosing one
+
+    def register(self, engine):
+        register_rules(self, engine)
+
+    def report(self, lineno, text):
+        self.findings.append((lineno, CONSTANT, 'plugin', (text,)))
+
+    # -----------------------
+    # walk helpers
+    # -----------------------
+    def _loop_of(self, node, ctx):
+        """Innermost loop of the current function that runs `node` once per iteration, or None."""
+        fn = ctx.functions[-1] if ctx.functions else None
+        for loop in reversed(ctx.loops):
+            if loop is node:
+                continue
+            info = self._loops.get(loop)
+            if info is None or info[0] is not fn:
+                return None
+            if repeats(loop, node):
+                return loop
+        return None
+
+    def _cost(self, loop):
+        return self._loops[loop][1] if loop is not None else CONSTANT
+
+    def _charge(self, fn, lineno, cost):
+        current = self._fn_cost.get(fn)
+        if current is None:
+            self._fn_cost[fn] = [cost, lineno]
+        elif cost > current[0]:
+            current[:] = [cost, lineno]
+
+    def _lookup(self, fn, name):
+        if fn is not None and (fn, name) in self._kinds:
+            return self._kinds[(fn, name)]
+        kind = self._kinds.get((None, name))
+        if name not in self._module_bound:
+            self.kind_deps[name] = kind
+        return kind
+
+    def _kind(self, ctx, node):
+        fn = ctx.functions[-1] if ctx.functions else None
+        return expr_kind(node, lambda name: self._lookup(fn, name))
+
+    def _bind(self, fn, name, kind):
+        self._kinds[(fn, name)] = kind
+        if fn is None:
+            self._module_bound.add(name)
+
+    # -----------------------
+    # handlers
+    # -----------------------
+    @handles(("perf.recursion", "perf.complexity"), SCOPE_NODES)
+    def visit_scope(self, node, ctx):
+        parent = ctx.scopes[-2] if len(ctx.scopes) > 1 else None
+        self._qualnames[node] = f"{self._qualnames[parent]}.{node.name}" if parent is not None else node.name
+
+    @handles("perf.nested-loops", LOOP_NODES)
+    def visit_loop(self, node, ctx):
+        if ctx.loop_depth > self.max_depth:
+            self.max_depth, self.max_depth_line = ctx.loop_depth, node.lineno
+
+    @handles(LOOP_RULES, LOOP_NODES + COMPREHENSION_NODES)
+    def enter_loop(self, node, ctx):
+        fn = ctx.functions[-1] if ctx.functions else None
+        parent = self._loop_of(node, ctx)
+        cost = add(self._cost(parent), loop_cost(node))
+        self._loops[node] = (fn, cost, parent)
+        self._charge(fn, node.lineno, cost)
+
+    @handles(KIND_RULES, FUNCTION_NODES)
+    def infer_params(self, node, ctx):
+        args = node.args
+        for arg in args.posonlyargs + args.args + args.kwonlyargs:
+            if arg.annotation is not None:
+                self._kinds[(node, arg.arg)] = annotation_kind(arg.annotation)
+        if args.vararg is not None:
+            self._kinds[(node, args.vararg.arg)] = "tuple"
+
+    @handles(KIND_RULES, (ast.Assign, ast.AnnAssign, ast.For, ast.AsyncFor))
+    def infer_assign(self, node, ctx):
+        fn = ctx.functions[-1] if ctx.functions else None
+        if isinstance(node, ast.Assign):
+            kind, targets = self._kind(ctx, node.value), node.targets
+        elif isinstance(node, ast.AnnAssign):
+            kind = annotation_kind(node.annotation)
+            if kind is None and node.value is not None:
+                kind = self._kind(ctx, node.value)
+            targets = [node.target]
+        else:
+            kind, targets = None, [node.target]  # a loop variable: element kind unknown
+        if kind == "list" and is_constant_list(node.value):
+            kind = LITERAL_LIST
+        for target in targets:
+            if isinstance(target, ast.Name):
+                self._bind(fn, target.id, kind)
+            elif isinstance(target, (ast.Tuple, ast.List)):
+                for elt in target.elts:
+                    if isinstance(elt, ast.Name):
+                        self._bind(fn, elt.id, None)
+
+    @handles(KIND_RULES, (ast.Call, ast.AugAssign))
+    def infer_growth(self, node, ctx):
+        # a small literal list that is grown is just a list from here on
+        if isinstance(node, ast.Call):
+            func = node.func
+            if not (isinstance(func, ast.Attribute) and func.attr in ("append", "extend", "insert")):
+                return
+            target = func.value
+        else:
+            target = node.target
+        if isinstance(target, ast.Name) and self._kind(ctx, target) == LITERAL_LIST:
+            self._bind(ctx.functions[-1] if ctx.functions else None, target.id, "list")
+
+    @handles("perf.append-in-loop", ast.Call)
+    def visit_append(self, node, ctx):
+        # look for x.append(...) inside a loop
+        if ctx.loop_depth > 0 and isinstance(node.func, ast.Attribute) and node.func.attr == "append":
+            cost = self._cost(self._loop_of(node, ctx))
+            self.findings.append((node.lineno, cost, 'append', (self.source.fragment(node.func.value, "list"),)))
+
+    @handles("perf.recursion", ast.ClassDef)
+    def visit_class(self, node, ctx):
+        self.classes[self._qualnames[node]] = [base.id for base in node.bases if isinstance(base, ast.Name)]
+
+    @handles("perf.recursion", FUNCTION_NODES)
+    def visit_function(self, node, ctx):
+        parent = ctx.scopes[-2] if len(ctx.scopes) > 1 else None
+        parent_fn = self._ids[ctx.functions[-2]] if len(ctx.functions) > 1 else None
+        if parent is None:
+            owner = MODULE
+        elif isinstance(parent, ast.ClassDef):
+            owner = ('c', self._qualnames[parent])
+        else:
+            owner = ('f', parent_fn)
+        params = node.args.posonlyargs + node.args.args
+        is_static = any(isinstance(d, ast.Name) and d.id == "staticmethod" for d in node.decorator_list)
+        if isinstance(parent, ast.ClassDef) and params and not is_static:
+            receiver = (self._qualnames[parent], params[0].arg)
+        else:
+            # a nested function sees the `self` of the method around it
+            receiver = self.functions[parent_fn][3] if parent_fn is not None else None
+        self._ids[node] = len(self.functions)
+        self.functions.append((self._qualnames[node], owner, parent_fn, receiver, node.lineno))
+
+    @handles("perf.recursion", ast.Call)
+    def visit_call(self, node, ctx):
+        # calls by name feed the call graph: f(...), self.m(...), Cls.m(...)
+        if ctx.functions:
+            caller = self._ids[ctx.functions[-1]]
+            func = node.func
+            if isinstance(func, ast.Name):
+                self.calls.append((caller, func.id, None))
+            elif isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+                self.calls.append((caller, func.value.id, func.attr))
+
+    @handles("perf.concat-in-loop", ast.AugAssign)
+    def visit_aug_assign(self, node, ctx):
+        target = node.target
+        if not (isinstance(node.op, ast.Add) and isinstance(target, ast.Name)):
+            return
+        # only a str target is copied on every +=; `total += 1` or `items += [...]` is fine
+        fn = ctx.functions[-1] if ctx.functions else None
+        kind = self._kind(ctx, target) or self._kind(ctx, node.value)
+        if kind == "str":
+            self._bind(fn, target.id, "str")
+            if ctx.loop_depth > 0:
+                cost = add(self._cost(self._loop_of(node, ctx)), LINEAR)
+                self.findings.append((node.lineno, cost, 'concat', ()))
+
+    @handles("perf.complexity", ast.Call)
+    def visit_call_cost(self, node, ctx):
+        if ctx.loops:
+            cost = call_cost(node)
+            if cost > CONSTANT:
+                loop = self._loop_of(node, ctx)
+                if loop is not None:
+                    self._charge(self._loops[loop][0], node.lineno, add(self._cost(loop), cost))
+
+    @handles("perf.membership-in-loop", ast.Compare)
+    def visit_compare(self, node, ctx):
+        if not ctx.loops:
+            return
+        for op, container in zip(node.ops, node.comparators):
+            # a literal list of constants is compiled to a tuple constant; leave those alone
+            if not isinstance(op, (ast.In, ast.NotIn)) or isinstance(container, ast.List):
+                continue
+            kind = self._kind(ctx, container)
+            if kind == LITERAL_LIST:
+                # so is a name bound to one, unless the loops around grow it
+                outer = ctx.loops[0]
+                if outer not in self._grown:
+                    self._grown[outer] = grown_names(outer)
+                kind = "list" if container.id in self._grown[outer] else None
+            if kind == "list":
+                loop = self._loop_of(node, ctx)
+                if loop is not None:
+                    cost = add(self._cost(loop), LINEAR)
+                    self._charge(self._loops[loop][0], node.lineno, cost)
+                    self.findings.append((node.lineno, cost, 'membership', (
+                        self.source.fragment(node, "in"), self.source.fragment(container, "list"))))
+                return
+
+    @handles("perf.pop-front", ast.Call)
+    def visit_pop_front(self, node, ctx):
+        func = node.func
+        if not ctx.loops or not isinstance(func, ast.Attribute) or not node.args:
+            return
+        first = node.args[0]
+        if not (isinstance(first, ast.Constant) and first.value == 0 and not isinstance(first.value, bool)):
+            return
+        if func.attr == "pop" and len(node.args) == 1:
+            alternative = "popleft"
+        elif func.attr == "insert" and len(node.args) == 2:
+            alternative = "appendleft"
+        else:
+            return
+        if self._kind(ctx, func.value) not in (None, "list", LITERAL_LIST):
+            return  # dict.pop(0) is a key lookup, deque.insert(0, x) is cheap
+        loop = self._loop_of(node, ctx)
+        if loop is not None:
+            cost = add(self._cost(loop), LINEAR)
+            self._charge(self._loops[loop][0], node.lineno, cost)
+            self.findings.append((node.lineno, cost, 'pop-front', (self.source.fragment(node, "pop"), alternative)))
+
+    @handles("perf.loop-invariant", ast.Call)
+    def visit_invariant(self, node, ctx):
+        if not ctx.loops or id(node) in self._inner:
+            return
+        loop = self._loop_of(node, ctx)
+        if loop is None:
+            return
+        cost = pure_call_cost(node)
+        if cost is None:
+            # an unknown call may change its arguments, and a method call its receiver
+            mutated = self._mutated[loop]
+            if isinstance(node.func, ast.Attribute):
+                mutated.add(root_name(node.func.value))
+            for arg in node.args:
+                mutated.add(root_name(arg))
+            for keyword in node.keywords:
+                mutated.add(root_name(keyword.value))
+            return
+        names = set()
+        for sub in ast.walk(node):
+            if sub is node:
+                continue
+            if isinstance(sub, ast.Call):
+                if pure_call_cost(sub) is None:
+                    return
+                self._inner.add(id(sub))  # report `len(set(x))` once, not also `set(x)`
+            elif isinstance(sub, (ast.Lambda, ast.NamedExpr, ast.Yield, ast.YieldFrom, ast.Await)):
+                return
+            elif isinstance(sub, ast.Name):
+                names.add(sub.id)
+        if isinstance(node.func, ast.Attribute):
+            names.add(root_name(node.func))
+        self._hoist.append((node.lineno, loop, names, self.source.fragment(node, "call"), cost))
+
+    @handles(("perf.loop-invariant", "perf.hot-lookups"), ast.Name)
+    def visit_name(self, node, ctx):
+        if not ctx.loops and not ctx.functions:
+            return
+        if isinstance(node.ctx, ast.Load):
+            if ctx.functions and "perf.hot-lookups" in self.enabled:
+                loop = self._loop_of(node, ctx)
+                if loop is not None:
+                    self._lookups[loop].setdefault(('name', node.id), [0, 1])[0] += 1
+            return
+        if ctx.functions:
+            self._locals[ctx.functions[-1]].add(node.id)
+        loop = self._loop_of(node, ctx)
+        if loop is not None:
+            self._rebound[loop].add(node.id)
+
+    @handles(("perf.loop-invariant", "perf.hot-lookups"), (ast.Attribute, ast.Subscript))
+    def visit_attribute(self, node, ctx):
+        if not ctx.loops:
+            return
+        if isinstance(node.ctx, ast.Load):
+            if not isinstance(node, ast.Attribute) or not ctx.functions or id(node) in self._inner \
+                    or "perf.hot-lookups" not in self.enabled:
+                return
+            inner = node.value
+            while isinstance(inner, ast.Attribute):
+                self._inner.add(id(inner))  # count `a.b.c` once, not also `a.b`
+                inner = inner.value
+            chain = dotted(node)
+            loop = self._loop_of(node, ctx) if chain is not None else None
+            if loop is not None:
+                self._lookups[loop].setdefault(('attr', chain), [0, chain.count(".")])[0] += 1
+            return
+        loop = self._loop_of(node, ctx)
+        if loop is not None:
+            self._mutated[loop].add(root_name(node))
+            chain = dotted(node) if isinstance(node, ast.Attribute) else None
+            if chain is not None:
+                self._rebound[loop].add(chain)
+
+    @handles("perf.hot-lookups", FUNCTION_NODES + (ast.ClassDef, ast.Lambda, ast.Import, ast.ImportFrom))
+    def track_locals(self, node, ctx):
+        if isinstance(node, FUNCTION_NODES):
+            # the function itself is on top of ctx.functions
+            parent = ctx.functions[-2] if len(ctx.functions) > 1 else None
+            self._fn_parent[node] = parent
+            if parent is not None:
+                self._locals[parent].add(node.name)
+            args = node.args
+        elif not ctx.functions:
+            return
+        elif isinstance(node, ast.ClassDef):
+            self._locals[ctx.functions[-1]].add(node.name)
+            return
+        elif isinstance(node, ast.Lambda):
+            args = node.args
+        else:
+            self._locals[ctx.functions[-1]].update(
+                (alias.asname or alias.name).split(".", 1)[0] for alias in node.names)
+            return
+        bound = self._locals[node if isinstance(node, FUNCTION_NODES) else ctx.functions[-1]]
+        bound.update(arg.arg for arg in args.posonlyargs + args.args + args.kwonlyargs)
+        bound.update(arg.arg for arg in (args.vararg, args.kwarg) if arg is not None)
+
+    # -----------------------
+    # results
+    # -----------------------
+    def _finish(self):
+        """Turn what the walk collected into findings and complexity entries (once)."""
+        if not self._loops:
+            return
+        # anything rebound or changed in an inner loop is changed in the loops around it too
+        for loop, (_, _, parent) in reversed(self._loops.items()):
+            if parent is not None:
+                if loop in self._rebound:
+                    self._rebound[parent] |= self._rebound[loop]
+                if loop in self._mutated:
+                    self._mutated[parent] |= self._mutated[loop]
+        for lineno, loop, names, text, cost in self._hoist:
+            if not names & self._rebound.get(loop, set()) and not names & self._mutated.get(loop, set()):
+                self.findings.append((lineno, add(self._cost(loop), cost), 'hoist', (text, loop.lineno - lineno)))
+        for loop, counts in self._lookups.items():
+            fn, cost, _ = self._loops[loop]
+            if cost < LINEAR:
+                continue
+            bound = set()
+            scope = fn
+            while scope is not None:
+                bound |= self._locals.get(scope, set())
+                scope = self._fn_parent.get(scope)
+            rebound = self._rebound.get(loop, set())
+            hot = []
+            for (kind, name), (seen, each) in counts.items():
+                if seen * each < LOOKUP_THRESHOLD or name in rebound:
+                    continue
+                if kind == 'name' and name in bound:
+                    continue
+                if kind == 'attr' and name.split(".", 1)[0] in rebound:
+                    continue
+                hot.append((-seen * each, name, kind, seen))
+            if hot:
+                hot.sort()
+                detail = tuple((kind, name, seen) for _, name, kind, seen in hot[:3])
+                self.findings.append((loop.lineno, cost, 'lookups', detail))
+        if "perf.complexity" in self.enabled:
+            for fn, (cost, lineno) in self._fn_cost.items():
+                if cost <= CONSTANT:
+                    continue
+                if fn is None:
+                    self.module_cost = [cost, lineno]
+                else:
+                    self.complexity.append((fn.lineno, self._qualnames.get(fn, fn.name), cost, lineno))
+            self.complexity.sort()
+        self._loops, self._fn_cost, self._hoist, self._inner = {}, {}, [], set()
+        self._locals.clear()
+        self._rebound.clear()
+        self._mutated.clear()
+        self._lookups.clear()
+
+    def block_data(self, start):
+        """Walk results with line numbers relative to `start` (see error_helper.incremental)."""
+        self._finish()
+        return {
+            'max_depth': self.max_depth,
+            'max_depth_line': None if self.max_depth_line is None else self.max_depth_line - start,
+            'findings': [(ln - start, cost, kind, detail) for ln, cost, kind, detail in self.findings],
+            'complexity': [(ln - start, name, cost, hot - start) for ln, name, cost, hot in self.complexity],
+            'module_cost': None if self.module_cost is None else (self.module_cost[0], self.module_cost[1] - start),
+            'functions': [(qualname, owner, parent_fn, receiver, ln - start)
+                          for qualname, owner, parent_fn, receiver, ln in self.functions],
+            'classes': self.classes,
+            'calls': self.calls,
+            'module_kinds': {name: self._kinds[(None, name)] for name in self._module_bound},
+            'kind_deps': self.kind_deps,
+        }
+
+    def merge_block(self, data, start):
+        """Add one block's block_data() back, at line `start`."""
+        if data['max_depth'] > self.max_depth:
+            self.max_depth, self.max_depth_line = data['max_depth'], start + data['max_depth_line']
+        self.findings.extend((start + ln, cost, kind, detail) for ln, cost, kind, detail in data['findings'])
+        self.complexity.extend((start + ln, name, cost, start + hot) for ln, name, cost, hot in data['complexity'])
+        if data['module_cost'] is not None:
+            cost, ln = data['module_cost']
+            if self.module_cost is None:
+                self.module_cost = [cost, start + ln]
+            elif cost > self.module_cost[0]:
+                self.module_cost = [cost, start + ln]
+        # call graph ids are block-local; shift them past the functions merged so far
+        base = len(self.functions)
+        for qualname, owner, parent_fn, receiver, ln in data['functions']:
+            if owner[0] == 'f':
+                owner = ('f', owner[1] + base)
+            self.functions.append((qualname, owner, None if parent_fn is None else parent_fn + base, receiver, start + ln))
+        self.classes.update(data['classes'])
+        self.calls.extend((caller + base, name, attr) for caller, name, attr in data['calls'])
+
+    def complexity_rows(self):
+        """[(lineno, function, 'O(...)')] in line order, module-level code included."""
+        self._finish()
+        rows = [(ln, name, label(cost)) for ln, name, cost, _ in self.complexity]
+        if self.module_cost is not None:
+            rows.append((self.module_cost[1], MODULE_NAME, label(self.module_cost[0])))
+            rows.sort()
+        return rows
+
+    def _describe(self, lineno, cost, kind, detail):
+        if kind == 'append':
+            return f"ที่บรรทัด {lineno} พบ `{detail[0]}.append(...)` ภายใน loop — พิจารณาใช้ list comprehension หรือ pre-allocate list เพื่อประสิทธิภาพ"
+        if kind == 'concat':
+            return f"ที่บรรทัด {lineno} พบการต่อ string (`+=`) ใน loop — ใช้ list append แล้ว `''.join()` แทนจะเร็วกว่า"
+        if kind == 'membership':
+            return (f"ที่บรรทัด {lineno} `{detail[0]}` ค้นหาใน list ภายใน loop — ครั้งละ O(n) รวมประมาณ {label(cost)}; "
+                    f"แปลง `{detail[1]}` เป็น set ก่อน loop")
+        if kind == 'pop-front':
+            return (f"ที่บรรทัด {lineno} `{detail[0]}` ใน loop — list ต้องเลื่อนสมาชิกทุกตัวทุกครั้ง รวมประมาณ {label(cost)}; "
+                    f"ใช้ `collections.deque` กับ `{detail[1]}()` แทน")
+        if kind == 'hoist':
+            return (f"ที่บรรทัด {lineno} `{detail[0]}` ได้ค่าเดิมทุกรอบของ loop ที่บรรทัด {lineno + detail[1]} — "
+                    f"คำนวณครั้งเดียวก่อน loop แล้วเก็บไว้ในตัวแปร")
+        if kind == 'lookups':
+            items = ", ".join(f"{'global ' if k == 'name' else ''}`{name}` {seen} ครั้ง" for k, name, seen in detail)
+            return (f"ใน loop ที่บรรทัด {lineno} มีการอ่าน {items} ทุกรอบ — ผูกไว้กับตัวแปร local ก่อน loop "
+                    f"(เช่น `append = out.append`) เพื่อลด lookup ใน loop ที่ทำงานบ่อย")
+        return f"ที่บรรทัด {lineno}: {detail[0]}"
+
+    def ranked(self):
+        """[(lineno or None, hint text)], costliest first; the line is what the hint points at."""
+        self._finish()
+        ranked = []  # (cost, weight, -lineno, lineno, text); highest cost first, then weight, then line
+        if self.max_depth >= 3:
+            ranked.append(((self.max_depth, 0), PERF_WEIGHTS['nested'], 0, self.max_depth_line,
+                           f"มี nested loop ความลึก {self.max_depth} — พิจารณา refactor หรือใช้ algorithms ที่ซับซ้อนน้อยลง"))
+        # a membership / pop(0) / loop-invariant hint on the costliest line already explains the estimate
+        explained = {}
+        for ln, cost, kind, _ in self.findings:
+            if kind in ('membership', 'pop-front', 'hoist'):
+                explained[ln] = max(explained.get(ln, CONSTANT), cost)
+        for ln, name, cost, hot in self.complexity:
+            if cost >= QUADRATIC and explained.get(hot, CONSTANT) < cost:
+                ranked.append((cost, PERF_WEIGHTS['complexity'], -ln, ln,
+                               f"ฟังก์ชัน `{name}` (บรรทัด {ln}) ประมาณ {label(cost)} — งานที่หนักที่สุดอยู่ที่บรรทัด {hot}; "
+                               f"ถ้าข้อมูลมีขนาดใหญ่ ลดงานในส่วนนั้น เช่น ใช้ dict/set แทนการวนซ้อนหรือการค้นหาใน list"))
+        if self.module_cost is not None and self.module_cost[0] >= QUADRATIC:
+            cost, ln = self.module_cost
+            if explained.get(ln, CONSTANT) < cost:
+                ranked.append((cost, PERF_WEIGHTS['complexity'], -ln, ln,
+                               f"โค้ดระดับโมดูลประมาณ {label(cost)} — งานที่หนักที่สุดอยู่ที่บรรทัด {ln}; "
+                               f"ย้ายเข้าไปในฟังก์ชันและลดงานในส่วนนั้นถ้าข้อมูลมีขนาดใหญ่"))
+        for ln, cost, kind, detail in self.findings:
+            ranked.append((cost, PERF_WEIGHTS[kind], -ln, ln, self._describe(ln, cost, kind, detail)))
+        edges = resolve_calls(self.functions, self.classes, self.calls)
+        for path, size in recursive_cycles(edges):
+            names = [self.functions[i][0] for i in path]
+            if len(path) == 1:
+                text = f"ฟังก์ชัน `{names[0]}` เรียกตัวเอง (recursion) — ตรวจ stack depth และพิจารณาใช้ iterative ถ้าจำเป็น"
+            else:
+                cycle = " → ".join(f"`{name}`" for name in names + names[:1])
+                extra = f" (กลุ่มนี้มีฟังก์ชันที่เรียกวนกัน {size} ตัว)" if size > len(path) else ""
+                text = f"ฟังก์ชัน {cycle} เรียกกันเป็นวง (mutual recursion){extra} — ตรวจ stack depth และพิจารณาใช้ iterative ถ้าจำเป็น"
+            # points at the def of the cycle's first function
+            ranked.append((LINEAR, PERF_WEIGHTS['recursion'], 0, self.functions[path[0]][4], text))
+        ranked.sort(key=lambda item: item[:3], reverse=True)
+        hints = [(ln, text) for _, _, _, ln, text in ranked]
+        if not hints:
+            hints.append((None, "ไม่พบ pattern ที่ชี้ชัดเรื่อง performance. โค้ดดูไม่มีปัญหา performance ที่ชัดเจนจาก static heuristics"))
+        return hints
+
+    def results(self):
+        return [text for _, text in self.ranked()]
+
+def is_main_guard(node):
+    return isinstance(node, ast.If) and getattr(node.test, 'left', None) and getattr(node.test.left, 'id', None) == '__name__'
+
+def has_main_guard(tree):
+    return any(is_main_guard(n) for n in tree.body)
+
+define_rule("structure.top-level", "โค้ดระดับ top-level มากเกินไป")
+define_rule("structure.no-functions", "ไม่มีฟังก์ชันเลย")
+define_rule("structure.main-guard", "ไม่มี if __name__ == '__main__'")
+define_rule("structure.long-function", "ฟังก์ชันยาวเกิน 80 บรรทัด")
+
+class StructureAnalyzer:
+    """Module layout suggestions: top-level code, main guard, long functions."""
+    group = "structure"
+
+    def __init__(self, rules=None):
+        self.enabled = resolve(rules)
+        self.func_count = 0
+        self.long_funcs = []
+        self.findings = []  # (lineno, text) from plugin rules
+        # top-level statements that are not defs or imports, and whether one is a main guard
+        self.top_level = 0
+        self.main_guard = False
+
+    def add_top_level(self, nodes):
+        """Count top-level statements: a whole tree.body, or one block of it at a time."""
+        self.top_level += sum(1 for n in nodes if not isinstance(n, (ast.FunctionDef, ast.ClassDef, ast.Import, ast.ImportFrom)))
+        self.main_guard = self.main_guard or any(is_main_guard(n) for n in nodes)
+
+    def register(self, engine):
+        register_rules(self, engine)
+
+    def report(self, lineno, text):
+        self.findings.append((lineno, text))
+
+    @handles("structure.no-functions", ast.FunctionDef)
+    def count_function(self, node, ctx):
+        self.func_count += 1
+
+    @handles("structure.long-function", ast.FunctionDef)
+    def visit_function(self, node, ctx):
+        n_lines = (getattr(node, 'end_lineno', None) or node.lineno) - node.lineno + 1
+        if n_lines > 80:
+            self.long_funcs.append((node.name, n_lines))
+
+    def results(self, tree=None):
+        """Suggestions for the module `tree`; without it, for the blocks passed to add_top_level."""
+        if tree is not None:
+            self.add_top_level(tree.body)
+        suggestions = []
+        # recommend modularization: functions for repeated logic
+        if self.top_level > 5 and "structure.top-level" in self.enabled:
+            suggestions.append("พบโค้ดหลายบรรทัดที่อยู่บนระดับ top-level — แนะนำย้ายโค้ดเหล่านี้เข้าไปในฟังก์ชันและเรียกจาก `if __name__ == '__main__'`")
+        if self.func_count == 0 and self.top_level > 0 and "structure.no-functions" in self.enabled:
+            suggestions.append("แนะนำสร้างฟังก์ชันแยกงานต่างๆ เพื่อให้ง่ายต่อการทดสอบและเรียกใช้ซ้ำ")
+        # recommend adding main guard
+        if "structure.main-guard" in self.enabled and not self.main_guard:
+            suggestions.append("พิจารณาเพิ่ม `if __name__ == '__main__':` เพื่อให้โค้ดสามารถนำเข้าเป็นโมดูลได้โดยไม่รันทันที")
+        # recommend splitting big functions
+        for name, n_lines in self.long_funcs:
+            suggestions.append(f"ฟังก์ชัน `{name}` ยาว {n_lines} บรรทัด — แนะนำแยกเป็นฟังก์ชันย่อย")
+        for ln, text in self.findings:
+            suggestions.append(f"ที่บรรทัด {ln}: {text}")
+        if not suggestions:
+            suggestions.append("โครงสร้างพื้นฐานดูเรียบร้อย — พิจารณาเพิ่ม docstring ให้ฟังก์ชันและคอมเมนต์สั้น ๆ")
+        return suggestions
+
+# -----------------------
+# Analysis Functions
+# -----------------------
+def explain_by_ast(code):
+    """Return list of (lineno, explanation) by traversing AST and mapping nodes to lines."""
+    tree, err = safe_parse(code)
+    if tree is None:
+        return [("0", f"ไม่สามารถอธิบายโค้ดได้: {err}")]
+    return run_analyzers(tree, [ExplainAnalyzer(SourceIndex(code))])[0].results()
+
+def performance_hints(code):
+    tree, _ = safe_parse(code)
+    if tree is None:
+        return ["ไม่สามารถวิเคราะห์ performance ได้ เนื่องจากโค้ดมี Syntax Error"]
+    return run_analyzers(tree, [PerformanceAnalyzer(SourceIndex(code))])[0].results()
+
+def suggest_structure(code):
+    tree, _ = safe_parse(code)
+    if tree is None:
+        return ["ไม่สามารถแนะนำโครงสร้างได้ เนื่องจากมี Syntax Error"]
+    return run_analyzers(tree, [StructureAnalyzer()])[0].results(tree)
+
+# -----------------------
+# Main actions
+# -----------------------
+def analyze_code(code_norm, tree, parse_err, rules=None):
+    """Run the AST analyzers (enabled rules of `rules`, None = defaults) over one already-parsed tree in a single traversal."""
+    out = {}
+    if tree is None:
+        out['explanations'] = [("0", f"ไม่สามารถอธิบายโค้ดได้: {parse_err}")]
+        out['performance_hints'] = ["ไม่สามารถวิเคราะห์ performance ได้ เนื่องจากโค้ดมี Syntax Error"]
+        out['performance_lines'] = [None]
+        out['structure_suggestions'] = ["ไม่สามารถแนะนำโครงสร้างได้ เนื่องจากมี Syntax Error"]
+        out['complexity'] = []
+        return out
+    source = SourceIndex(code_norm)
+    explain, perf, structure = run_analyzers(
+        tree, [ExplainAnalyzer(source, rules), PerformanceAnalyzer(source, rules), StructureAnalyzer(rules)])
+    with stage("results"):
+        out['explanations'] = explain.results()
+        ranked = perf.ranked()
+        out['performance_hints'] = [text for _, text in ranked]
+        # the line each hint points at (None for whole-module hints), for matching with measurements
+        out['performance_lines'] = [ln for ln, _ in ranked]
+        out['complexity'] = perf.complexity_rows()
+        out['structure_suggestions'] = structure.results(tree)
+    return out
+
+def iter_full_analysis(code, max_line_len=79, rules=None):
+    """
+    do_full_analysis one stage at a time: yields dicts of result keys as each stage
+    finishes, so a caller that has to stop early (see error_helper.sandbox) keeps them.
+    """
+    with stage("normalize"):
+        code_norm = normalize_indentation(code)
+    with stage("parse"):
+        tree, parse_err = safe_parse(code_norm)
+    yield {'normalized_code': code_norm, 'syntax_error': parse_err}
+    # style and naming come from one token stream, which also works on broken code
+    with stage("pep8"):
+        pep8_issues = pep8_checks(code_norm, max_line=max_line_len, rules=rules)
+    yield {'pep8_issues': pep8_issues}
+    # analyzers describe the user's (normalized) code, not the auto-fixed attempt
+    yield analyze_code(code_norm, tree, parse_err, rules)
+    if parse_err:
+        # attempt automatic fix then reparse
+        with stage("auto_fix"):
+            fixed, notes = repair(code_norm)
+            tree2, parse_err2 = safe_parse(fixed)
+        yield {
+            'auto_fixed_attempt': fixed,
+            'auto_fix_notes': notes,
+            'auto_fix_success': parse_err2 is None,
+            'syntax_error_after_fix': parse_err2,
+        }
+        if parse_err2 is None:
+            tree = tree2
+    # attempt rewrite via AST unparse if parse ok
+    rewritten = None
+    if tree is not None:
+        with stage("unparse"):
+            rewritten = format_unparsed(attempt_unparse(tree))
+    yield {'rewritten_code': rewritten}
+
+def do_full_analysis(code, max_line_len=79, rules=None):
+    """All results for `code`; `rules` is a frozenset of enabled rule ids (None = defaults, see error_helper.rules)."""
+    out = {}
+    for part in iter_full_analysis(code, max_line_len=max_line_len, rules=rules):
+        out.update(part)
+    return out
+
+def format_unparsed(up):
+    """Finish ast.unparse output for display; None stays None."""
+    if not up:
+        return None
+    import textwrap  # deferred: only needed once a tree is available
+    # ast.unparse may produce compact formatting — re-indent nicely
+    return textwrap.dedent(up) + ("\n" if not up.endswith("\n") else "")
+
+def suggest_rewrite(result, code):
+    """
+    From a do_full_analysis result, return (rewritten, suggested): the best normalized
+    code available and a refactor skeleton that wraps it in main() with a main guard.
+    """
+    rewritten = result.get('rewritten_code') or result.get('auto_fixed_attempt') or normalize_indentation(code)
+    tree, _ = safe_parse(rewritten)
+    if tree is not None and has_main_guard(tree):
+        return rewritten, rewritten
+    if tree is None:
+        return rewritten, rewritten + "\n\n# Add: if __name__ == '__main__': main()"
+    # naive: include all code but indent everything by 4 (conservative)
+    suggested = (
+        "# Suggested refactor: separate logic into functions and add main guard\n"
+        "def main():\n"
+    )
+    suggested += "".join("    " + ln + "\n" for ln in rewritten.splitlines())
+    suggested += "\nif __name__ == '__main__':\n    main()\n"
+    return rewritten, suggested
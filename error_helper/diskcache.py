@@ -0,0 +1,229 @@
+"""
+On-disk store of do_full_analysis results, shared by processes, replicas and restarts.
+
+One SQLite file holds one row per result, keyed like the in-process cache (a hash of
+ANALYZER_VERSION, max_line_len, the rule selection and the code), the result marshalled and zlib-compressed.
+The database runs in WAL mode, so readers never wait for a writer and concurrent
+writers (Streamlit replicas, batch workers) queue on SQLite's lock for up to
+BUSY_TIMEOUT seconds. A store that is locked, full or corrupt only costs a miss: it
+never fails an analysis.
+
+Entries older than `max_age` (by last use) are dropped and, past `max_size` bytes of
+compressed data, the least recently used go first. Eviction runs when the store is
+opened and every EVICT_EVERY writes from a process.
+"""
+import contextlib
+import marshal
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+
+from error_helper.cache import result_key
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+EVICT_EVERY = 64
+# a hit refreshes the entry's last-use time at most this often (every write takes the lock)
+TOUCH_SECONDS = 3600
+BUSY_TIMEOUT = 5.0
+# results hold only str/int/bool/None/list/tuple/dict, which marshal round-trips exactly
+# (tuples stay tuples) without pickle's arbitrary-object loading; its format is per Python version
+FORMAT = f"marshal{marshal.version}-py{sys.version_info[0]}.{sys.version_info[1]}"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+def default_path():
+    """$ERROR_HELPER_CACHE_DIR (empty disables), else $XDG_CACHE_HOME or ~/.cache, /error_helper/analysis.sqlite3."""
+    directory = os.environ.get("ERROR_HELPER_CACHE_DIR")
+    if directory is None:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        directory = os.path.join(base, "error_helper")
+    if not directory:
+        return None
+    return os.path.join(directory, "analysis.sqlite3")
+
+def open_default(**options):
+    """DiskCache at default_path(), or None when disabled or the location is not writable."""
+    path = default_path()
+    if path is None:
+        return None
+    try:
+        return DiskCache(path, **options)
+    except OSError:
+        return None
+
+@contextlib.contextmanager
+def _transaction(conn):
+    # the connection is in autocommit mode; take the write lock up front so the
+    # statements inside see and change one consistent state
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+def encode(result):
+    return zlib.compress(marshal.dumps(result), 1)
+
+def decode(blob):
+    return marshal.loads(zlib.decompress(blob))
+
+class DiskCache:
+    """
+    Persistent result store. Thread- and process-safe; each thread (and each forked
+    process) gets its own connection. `get`/`put` work on keys from cache.result_key.
+    """
+    def __init__(self, path=None, max_size=DEFAULT_MAX_SIZE, max_age=DEFAULT_MAX_AGE):
+        self.path = path or default_path()
+        self.max_size = max_size
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._writes = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._guard():
+            self._open_schema()
+            self.evict()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        # a connection must not cross fork() into a pool worker
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _open_schema(self):
+        conn = self._connect()
+        conn.executescript(_SCHEMA)
+        row = conn.execute("SELECT value FROM meta WHERE name = 'format'").fetchone()
+        if row is None or row[0] != FORMAT:
+            # written by another Python: the blobs cannot be read here, start over
+            with _transaction(conn):
+                conn.execute("DELETE FROM results")
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('format', ?)", (FORMAT,))
+
+    @contextlib.contextmanager
+    def _guard(self):
+        """Turn a locked, full or corrupt store into a no-op, counted in stats()['errors']."""
+        try:
+            yield
+        except (sqlite3.Error, ValueError, EOFError, TypeError, zlib.error):
+            with self._lock:
+                self.errors += 1
+
+    def get(self, key):
+        result = None
+        with self._guard():
+            conn = self._connect()
+            row = conn.execute("SELECT value, used FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                now = time.time()
+                if now - row[1] > self.max_age:
+                    conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                else:
+                    result = decode(row[0])
+                    if now - row[1] > TOUCH_SECONDS:
+                        conn.execute("UPDATE results SET used = ? WHERE key = ?", (now, key))
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def put(self, key, result):
+        blob = encode(result)
+        if len(blob) > self.max_size:
+            return
+        with self._guard():
+            self._connect().execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                                    (key, blob, len(blob), time.time()))
+            with self._lock:
+                self._writes += 1
+                due = self._writes % EVICT_EVERY == 0
+            if due:
+                self.evict()
+
+    def evict(self):
+        """Drop entries unused for `max_age`, then least recently used ones down to `max_size`."""
+        conn = self._connect()
+        with _transaction(conn):
+            conn.execute("DELETE FROM results WHERE used < ?", (time.time() - self.max_age,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total <= self.max_size:
+                return
+            # remove down to 90% so the next few writes do not each trigger another pass
+            excess = total - self.max_size * 9 // 10
+            cutoff = None
+            for used, size in conn.execute("SELECT used, size FROM results ORDER BY used"):
+                excess -= size
+                cutoff = used
+                if excess <= 0:
+                    break
+            conn.execute("DELETE FROM results WHERE used <= ?", (cutoff,))
+
+    def invalidate(self, key=None):
+        """Drop one entry (by key) or, with no key, every entry (for all processes sharing the file)."""
+        with self._guard():
+            if key is None:
+                self._connect().execute("DELETE FROM results")
+            else:
+                self._connect().execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def stats(self):
+        entries, size = 0, 0
+        with self._guard():
+            entries, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'path': self.path,
+                'entries': entries,
+                'size': size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def analyze(self, code, max_line_len=79, rules=None, compute=None):
+        """Stored result for `code`, or compute it (do_full_analysis by default) and store it."""
+        key = result_key(code, max_line_len, rules)
+        result = self.get(key)
+        if result is None:
+            if compute is None:
+                from error_helper.core import do_full_analysis as compute
+            result = compute(code, max_line_len=max_line_len, rules=rules)
+            if not result.get('incomplete'):
+                self.put(key, result)
+        return result
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local = threading.local()
@@ -0,0 +1,341 @@
+"""
+Opt-in dynamic profiling: run the pasted code for real and measure where time and memory go.
+
+The static hints only guess. `profile_code()` runs the code (then, optionally, an entry
+call such as `main()` or `solve(list(range(10_000)))`) in a fresh "spawn" process and
+measures it three ways at once:
+
+- a line timer (sys.settrace, pasted code only): hits and time per line. Time spent in
+  library calls is charged to the calling line, time in other pasted functions to
+  their own lines, so the lines of any span add up without double counting;
+- cProfile: calls, own and cumulative time per function, library functions included;
+- tracemalloc: peak traced memory, and memory still held per line when the run ends.
+
+Tracing slows the code down several times; the numbers are for comparing lines with
+each other, not absolute timings. `match_hints()` puts them next to the static
+performance hints via result['performance_lines'].
+
+The child runs with the limits of error_helper.sandbox (CPU time, address space, a
+wall-clock kill by the parent), no file writes (RLIMIT_FSIZE 0), stdin/stdout/stderr
+detached, in an empty temporary directory removed afterwards. That keeps a runaway paste
+from hurting the server; it is not a security boundary (the code can still read files
+and use the network), so only offer it where running the users' code is acceptable.
+That is the operator's decision: the page offers it only when $ERROR_HELPER_ALLOW_RUN_CODE
+is set to 1 where the server runs (see run_code_allowed).
+"""
+import ast
+import os
+import time
+
+WALL_SECONDS = 10
+CPU_SECONDS = 5
+MEMORY_MB = 512
+FILENAME = "<pasted code>"
+ENTRY_FILENAME = "<entry>"  # the entry call; its frame spans the whole run, so it is not a row
+OUTPUT_LIMIT = 10_000
+FUNCTION_LIMIT = 30
+# harness frames that would otherwise top the cumulative-time table
+_HARNESS = ("<built-in method builtins.exec>", "<built-in method builtins.eval>",
+            "<method 'disable' of '_lsprof.Profiler' objects>")
+
+ALLOW_ENV = "ERROR_HELPER_ALLOW_RUN_CODE"
+
+STATUS_MESSAGES = {
+    'ok': "รันจบตามปกติ",
+    'error': "โค้ดหยุดเพราะ exception",
+    'wall': "หยุดรัน: ใช้เวลาเกิน {wall} วินาที",
+    'cpu': "หยุดรัน: ใช้ CPU เกิน {cpu} วินาที",
+    'memory': "หยุดรัน: ใช้หน่วยความจำเกิน {memory} MB",
+    'crash': "process ที่รันโค้ดหยุดทำงานกลางคัน",
+}
+
+def run_code_allowed():
+    """True if the operator enabled running pasted code ($ERROR_HELPER_ALLOW_RUN_CODE=1; off by default)."""
+    return os.environ.get(ALLOW_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+class _Output:
+    """sys.stdout/sys.stderr stand-in that keeps the first OUTPUT_LIMIT characters."""
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def write(self, text):
+        if self.size < OUTPUT_LIMIT:
+            text = str(text)[:OUTPUT_LIMIT - self.size]
+            self.parts.append(text)
+            self.size += len(text)
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def getvalue(self):
+        text = "".join(self.parts)
+        return text + ("\n…" if self.size >= OUTPUT_LIMIT else "")
+
+class LineTimer:
+    """sys.settrace hook timing the lines of code compiled as `filename`."""
+    def __init__(self, filename=FILENAME):
+        self.filename = filename
+        self.hits = {}
+        self.times = {}
+        self._stack = []  # line running in each traced frame, innermost last
+        self._last = time.perf_counter()
+
+    def _charge(self):
+        now = time.perf_counter()
+        if self._stack:
+            line = self._stack[-1]
+            if line is not None:
+                self.times[line] = self.times.get(line, 0.0) + now - self._last
+        self._last = now
+
+    def trace(self, frame, event, arg):
+        # global hook: only 'call' events arrive here; other files are not traced line by line
+        if frame.f_code.co_filename != self.filename:
+            return None
+        self._charge()
+        # no line yet (f_lineno is 0 for a module frame): the frame's setup is not charged to any line
+        self._stack.append(None)
+        return self._local
+
+    def _local(self, frame, event, arg):
+        if event == "line":
+            self._charge()
+            self._stack[-1] = frame.f_lineno
+            self.hits[frame.f_lineno] = self.hits.get(frame.f_lineno, 0) + 1
+        elif event == "return":  # also a generator's yield and a frame left by an exception
+            self._charge()
+            self._stack.pop()
+        return self._local
+
+# -----------------------
+# Child process
+# -----------------------
+def _held_by_function(code, held):
+    """
+    {(name, first line): bytes} of the memory still held per line, summed over the lines of
+    each pasted function (nested functions apart); module code as ('<module>', 1).
+    """
+    owners = []  # (first body line, last line, key)
+    for node in ast.walk(ast.parse(code)):
+        if isinstance(node, _DEF_NODES):
+            first = min([node.lineno] + [d.lineno for d in node.decorator_list])  # as co_firstlineno
+            owners.append((node.body[0].lineno, node.end_lineno, (node.name, first)))
+    owners.sort(key=lambda owner: (owner[0], -owner[1]))  # outer functions first
+    totals = {}
+    for line, size in held.items():
+        key = ('<module>', 1)
+        for start, end, owner in owners:
+            if start <= line <= end:
+                key = owner  # later matches are nested deeper
+        totals[key] = totals.get(key, 0) + size
+    return totals
+
+def _function_rows(profiler, held_by_function):
+    import pstats
+    rows = []
+    for (filename, lineno, name), (_, calls, own, cumulative, _) in pstats.Stats(profiler).stats.items():
+        held = None
+        if filename == FILENAME:
+            label, line = name, lineno
+            held = held_by_function.get((name, lineno), 0)
+        elif filename == "~":  # built-in
+            label, line = name, None
+        else:
+            label, line = f"{os.path.basename(filename)}:{name}", None
+        if label in _HARNESS or filename in (__file__, ENTRY_FILENAME):
+            continue
+        rows.append((label, line, calls, own, cumulative, held))
+    rows.sort(key=lambda row: row[4], reverse=True)
+    return rows[:FUNCTION_LIMIT]
+
+def _measure(code, entry, release=None):
+    """
+    Run `code` (then `entry`) under all three profilers; the result dict of profile_code.
+    `release()` lifts the CPU limit once the code has stopped, before the bookkeeping.
+    """
+    import cProfile
+    import sys
+    import tracemalloc
+
+    from error_helper.sandbox import CPULimitExceeded
+
+    compiled = compile(code, FILENAME, "exec")
+    entry_code = compile(entry, ENTRY_FILENAME, "eval") if entry else None
+    # with an entry call the main guard stays off, so main() does not run twice
+    namespace = {'__name__': "__profile__" if entry else "__main__", '__builtins__': __builtins__}
+    output = _Output()
+    sys.stdout = sys.stderr = output
+    timer = LineTimer()
+    profiler = cProfile.Profile()
+    status, message = 'ok', None
+    tracemalloc.start()
+    start = time.perf_counter()
+    sys.settrace(timer.trace)
+    profiler.enable()
+    try:
+        exec(compiled, namespace)
+        if entry_code is not None:
+            namespace['__profile_result__'] = eval(entry_code, namespace)
+    except SystemExit as e:
+        message = f"SystemExit({e.code!r})"
+    except MemoryError:
+        status = 'memory'
+    except CPULimitExceeded:
+        status = 'cpu'
+    except BaseException as e:
+        status, message = 'error', f"{type(e).__name__}: {e}"
+    finally:
+        profiler.disable()
+        sys.settrace(None)
+        elapsed = time.perf_counter() - start
+        if release is not None:
+            release()
+    peak = tracemalloc.get_traced_memory()[1]
+    held = {}
+    # memory still referenced (module globals, the entry's result) at the end, per line
+    snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, FILENAME)])
+    for stat in snapshot.statistics("lineno"):
+        held[stat.traceback[0].lineno] = stat.size
+    tracemalloc.stop()
+    # line 0 is the module frame before its first line: counted for '<module>' below, not as a line
+    lines = sorted(ln for ln in set(timer.hits) | set(timer.times) | set(held) if ln)
+    return {
+        'status': status,
+        'message': message,
+        'elapsed': elapsed,
+        'peak_memory': peak,
+        'lines': [(ln, timer.hits.get(ln, 0), timer.times.get(ln, 0.0), held.get(ln, 0)) for ln in lines],
+        'functions': _function_rows(profiler, _held_by_function(code, held)),
+        'output': output.getvalue(),
+    }
+
+def _child_main(conn, code, entry, cpu_seconds, memory_mb, workdir):
+    # detach from the server's terminal and working directory before running anything
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    os.chdir(workdir)
+    try:
+        import resource
+        import signal
+    except ImportError:  # not POSIX: wall-clock limit only
+        resource = None
+    release = None
+    if resource is not None:
+        from error_helper.sandbox import _clear_cpu_limit, _on_xcpu, _set_cpu_limit, _set_memory_limit
+        signal.signal(signal.SIGXCPU, _on_xcpu)
+        signal.signal(signal.SIGXFSZ, signal.SIG_IGN)  # a write then fails with OSError instead
+        resource.setrlimit(resource.RLIMIT_FSIZE, (0, resource.getrlimit(resource.RLIMIT_FSIZE)[1]))
+        if memory_mb:
+            _set_memory_limit(resource, memory_mb)
+        _set_cpu_limit(resource, cpu_seconds)
+        release = lambda: _clear_cpu_limit(resource)  # noqa: E731
+    try:
+        result = _measure(code, entry, release)
+    except MemoryError:
+        result = {'status': 'memory'}
+    except SyntaxError as e:
+        result = {'status': 'error', 'message': f"SyntaxError: {e}"}
+    conn.send(result)
+    conn.close()
+
+# -----------------------
+# Parent side
+# -----------------------
+def _failed(status, elapsed=0.0, message=None):
+    return {'status': status, 'message': message, 'elapsed': elapsed, 'peak_memory': 0, 'lines': [],
+            'functions': [], 'output': ""}
+
+def profile_code(code, entry=None, wall_seconds=WALL_SECONDS, cpu_seconds=CPU_SECONDS, memory_mb=MEMORY_MB):
+    """
+    Run `code` (and the expression `entry`, if given) in a fresh process and return
+    {'status', 'message', 'elapsed', 'peak_memory', 'lines': [(lineno, hits, seconds, bytes held)],
+     'functions': [(name, lineno or None, calls, own seconds, cumulative seconds, bytes held or None)],
+     'output'}.
+    `status` is a STATUS_MESSAGES key; measurements up to an exception are kept. Memory is
+    what is still allocated when the run ends (per line, and per pasted function summed
+    over its lines), not everything allocated along the way; `peak_memory` covers that.
+    """
+    import multiprocessing
+    import tempfile
+    ctx = multiprocessing.get_context("spawn")
+    # the child's working directory; removed with whatever the code left in it once the child is gone
+    workdir = tempfile.TemporaryDirectory(prefix="error_helper-profile-", ignore_cleanup_errors=True)
+    conn, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_child_main, args=(child, code, entry, cpu_seconds, memory_mb, workdir.name),
+                          daemon=True)
+    start = time.monotonic()
+    process.start()
+    child.close()
+    try:
+        if conn.poll(wall_seconds):
+            result = dict(_failed('ok'), **conn.recv())
+        else:
+            result = _failed('wall', time.monotonic() - start)
+    except (EOFError, OSError):
+        result = _failed('crash', time.monotonic() - start)
+    finally:
+        process.join(timeout=1)
+        if process.is_alive():
+            process.kill()
+            process.join(timeout=1)
+        conn.close()
+        workdir.cleanup()
+    return result
+
+def status_text(result, wall_seconds=WALL_SECONDS, cpu_seconds=CPU_SECONDS, memory_mb=MEMORY_MB):
+    text = STATUS_MESSAGES[result['status']].format(wall=wall_seconds, cpu=cpu_seconds, memory=memory_mb)
+    return f"{text}: {result['message']}" if result.get('message') else text
+
+# -----------------------
+# Matching with the static hints
+# -----------------------
+_LOOP_NODES = (ast.For, ast.AsyncFor, ast.While)
+_DEF_NODES = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+def _spans(code):
+    """
+    Header line -> (first, last) measured line of every loop and def: a hint on a loop
+    covers the loop, one on a def the body (the def line itself runs once, at import).
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return {}
+    spans = {}
+    for node in ast.walk(tree):
+        if isinstance(node, _LOOP_NODES + _DEF_NODES) and node.lineno not in spans:
+            first = node.body[0].lineno if isinstance(node, _DEF_NODES) else node.lineno
+            spans[node.lineno] = (first, node.end_lineno)
+    return spans
+
+def match_hints(code, hints, hint_lines, result):
+    """
+    [(hint, line, {'hits', 'seconds', 'share', 'memory'} or None)] in the hints' order.
+    A hint on a loop or def header is measured over the whole loop or body, any other
+    over its line; `hits` counts runs of its first line and `share` is the fraction of
+    the run's traced time. None means no line number, or code that never ran. `code`
+    must be the code that was profiled (the analysis' normalized_code) so lines agree.
+    """
+    by_line = {ln: (hits, seconds, held) for ln, hits, seconds, held in result['lines']}
+    total = sum(seconds for _, seconds, _ in by_line.values())
+    spans = _spans(code)
+    rows = []
+    for hint, line in zip(hints, hint_lines):
+        measured = None
+        cells = []
+        if line is not None:
+            first, last = spans.get(line, (line, line))
+            cells = [by_line[ln] for ln in range(first, last + 1) if ln in by_line]
+        if cells and any(hits for hits, _, _ in cells):
+            seconds = sum(cell[1] for cell in cells)
+            measured = {
+                'hits': by_line[first][0] if first in by_line else 0,
+                'seconds': seconds,
+                'share': seconds / total if total else 0.0,
+                'memory': sum(cell[2] for cell in cells),
+            }
+        rows.append((hint, line, measured))
+    return rows
@@ -0,0 +1,335 @@
+"""
+Diff-aware analysis: report only what lies on changed lines, for pre-commit and CI.
+
+The changed lines come from a local `git diff` (parse_diff over `git diff -U0`) or from
+two revisions of one file (changed_lines); for staged changes, git_staged reads the
+index version of the files, which is what the staged line numbers refer to. `analyze_changed()` then works like the
+incremental analyzer (error_helper.incremental) on a subset of blocks: the file is parsed
+once, and only the top-level statements whose lines intersect a change run through the
+analyzers. A top-level class is cut down first to the members that intersect, so an edit
+in one method of a large class does not re-analyze the others, and the style checks
+tokenize only the changed statements. Style issues and explanations are then kept on
+changed lines only; performance hints and complexity rows also when they point at a
+loop or def whose lines include one (a new lookup in a loop body shows the hint on the
+loop header). Results with no line (the whole-module structure advice) are dropped.
+
+Checks that span definitions see only what was analyzed: mutual recursion through an
+unchanged function is not reported. The kinds of globals that an analyzed statement
+relies on are still right: the earlier statements that assign those globals are
+analyzed too (for context; their own results stay suppressed).
+"""
+import ast
+import bisect
+import copy
+import os
+import re
+import subprocess
+
+from error_helper.core import do_full_analysis, normalize_indentation, safe_parse
+from error_helper.incremental import analyze_block, merge_blocks, split_blocks
+from error_helper.instrument import stage
+from error_helper.pep8 import pep8_checks
+from error_helper.rules import resolve
+
+_HUNK = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+_LOOP_NODES = (ast.For, ast.AsyncFor, ast.While)
+_DEF_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+# statements whose bodies still run at module level (for finding assignments to globals)
+_BLOCK_STATEMENTS = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.With, ast.AsyncWith, ast.Try)
+
+# -----------------------
+# Changed lines
+# -----------------------
+def _ranges(lines):
+    """Sorted, merged [(first, last)] for an iterable of line numbers."""
+    ranges = []
+    for line in sorted(set(lines)):
+        if ranges and line == ranges[-1][1] + 1:
+            ranges[-1][1] = line
+        else:
+            ranges.append([line, line])
+    return [tuple(r) for r in ranges]
+
+def _diff_path(header):
+    path = header[4:].rstrip("\n").split("\t", 1)[0]
+    if path == "/dev/null":
+        return None
+    if path.startswith('"'):  # git quotes paths with unusual characters
+        path = path[1:-1].encode("latin-1").decode("unicode_escape").encode("latin-1").decode("utf-8")
+    return path[2:] if path[:2] == "b/" else path
+
+def parse_diff(text):
+    """
+    {path: [(first, last)]} of the lines added or changed in the new version of each file
+    of a unified diff (any context size). Deleted files and pure deletions add nothing.
+    """
+    changed = {}
+    path = None
+    line = 0
+    for row in text.splitlines():
+        if row.startswith("+++ "):
+            path = _diff_path(row)
+            if path is not None:
+                changed.setdefault(path, [])
+            continue
+        match = _HUNK.match(row)
+        if match:
+            line = int(match.group(1))
+            continue
+        if path is None or row.startswith(("---", "diff ", "index ")):
+            continue
+        if row.startswith("+"):
+            changed[path].append(line)
+            line += 1
+        elif row.startswith(" "):
+            line += 1
+    return {path: _ranges(lines) for path, lines in changed.items()}
+
+def git_changed(paths=(), base=None, staged=False, cwd=None):
+    """
+    {absolute path: [(first, last)]} of the lines changed in the working tree against
+    `base` (a revision; default: the index, i.e. unstaged changes), or with staged=True,
+    in the index against `base` (default HEAD): what a pre-commit hook checks.
+    `paths` (files, directories, globs) may lie in different repositories: each is
+    diffed in its own; without paths, the repository of `cwd`.
+    Raises OSError if git is missing, ValueError if the diff fails.
+    """
+    groups = _by_repo(paths) if paths else {_top(cwd or "."): []}
+    changed = {}
+    for top, group in groups.items():
+        args = ["diff", "--no-color", "--no-ext-diff", "--src-prefix=a/", "--dst-prefix=b/", "-U0"]
+        if staged:
+            args.append("--cached")
+        if base:
+            args.append(base)
+        args.append("--")
+        args.extend(group)
+        for path, ranges in parse_diff(_git(args, top)).items():
+            changed[os.path.realpath(os.path.join(top, path))] = ranges
+    return changed
+
+def git_staged(paths):
+    """
+    {absolute path: text} of the staged (index) version of each of `paths`, for checking
+    what will be committed rather than the working tree; paths not in the index are left
+    out. Raises OSError if git is missing, ValueError if it fails.
+    """
+    staged = {}
+    for top, group in _by_repo(paths).items():
+        group = [os.path.realpath(path) for path in group]
+        request = "".join(f":{os.path.relpath(path, top)}\n" for path in group).encode("utf-8", "surrogateescape")
+        run = subprocess.run(["git", "cat-file", "--batch"], cwd=top, input=request, capture_output=True)
+        if run.returncode:
+            raise ValueError(f"git cat-file ล้มเหลว: {run.stderr.decode('utf-8', 'replace').strip()}")
+        out, position = run.stdout, 0
+        for path in group:
+            end = out.index(b"\n", position)
+            header = out[position:end].split()
+            position = end + 1
+            if header[-1] == b"missing":
+                continue
+            size = int(header[2])
+            staged[path] = out[position:position + size].decode("utf-8", errors="replace")
+            position += size + 1  # the blob is followed by a newline
+    return staged
+
+def _top(folder):
+    return os.path.realpath(_git(["rev-parse", "--show-toplevel"], folder).strip())
+
+def _by_repo(paths):
+    """{work tree top: [absolute paths]}: each path with the repository that holds it."""
+    groups, tops = {}, {}
+    for path in paths:
+        path = os.path.realpath(path)  # as git sees it from the (real) top
+        folder = path
+        while not os.path.isdir(folder):  # a file, or a glob pattern: its nearest existing directory
+            folder = os.path.dirname(folder)
+        if folder not in tops:
+            tops[folder] = _top(folder)
+        groups.setdefault(tops[folder], []).append(path)
+    return groups
+
+def _git(args, cwd):
+    run = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, encoding="utf-8",
+                         errors="surrogateescape")
+    if run.returncode:
+        raise ValueError(f"git {args[0]} ล้มเหลว: {run.stderr.strip()}")
+    return run.stdout
+
+def changed_lines(old_code, new_code):
+    """[(first, last)] of the lines of `new_code` that are added or changed relative to `old_code`."""
+    import difflib
+    matcher = difflib.SequenceMatcher(None, old_code.splitlines(), new_code.splitlines(), autojunk=False)
+    return [(j1 + 1, j2) for tag, _, _, j1, j2 in matcher.get_opcodes() if tag in ("replace", "insert")]
+
+def touches(ranges, first, last):
+    """True if the lines first..last include a line of `ranges`."""
+    index = bisect.bisect_left(ranges, (first,))
+    if index and ranges[index - 1][1] >= first:
+        return True
+    return index < len(ranges) and ranges[index][0] <= last
+
+# -----------------------
+# Analysis
+# -----------------------
+def _start(node):
+    return min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", ())])
+
+def _prune(nodes, ranges):
+    """The block's statements, a top-level class cut down to the members that touch `ranges`."""
+    pruned = []
+    for node in nodes:
+        if isinstance(node, ast.ClassDef):
+            body = [member for member in node.body if touches(ranges, _start(member), member.end_lineno)]
+            if len(body) < len(node.body):
+                node = copy.copy(node)
+                node.body = body or [ast.Pass(lineno=node.lineno, col_offset=node.col_offset,
+                                              end_lineno=node.lineno, end_col_offset=node.col_offset)]
+        pruned.append(node)
+    return pruned
+
+def _assigned(nodes):
+    """Globals that the module-level code of `nodes` assigns (what PerformanceAnalyzer infers kinds for)."""
+    names = set()
+    todo = list(nodes)
+    while todo:
+        node = todo.pop()
+        if isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign, ast.For, ast.AsyncFor)):
+            for target in (node.targets if isinstance(node, ast.Assign) else [node.target]):
+                names.update(n.id for n in ast.walk(target) if isinstance(n, ast.Name))
+        if isinstance(node, _BLOCK_STATEMENTS):
+            todo.extend(node.body)
+            todo.extend(getattr(node, "orelse", ()))
+            todo.extend(getattr(node, "finalbody", ()))
+            for handler in getattr(node, "handlers", ()):
+                todo.extend(handler.body)
+    return names
+
+def _spans(nodes):
+    """Header line -> last line of every loop and def in `nodes`."""
+    spans = {}
+    for node in nodes:
+        for inner in ast.walk(node):
+            if isinstance(inner, _LOOP_NODES + _DEF_NODES):
+                spans.setdefault(inner.lineno, inner.end_lineno)
+    return spans
+
+def _keep(ranges, spans):
+    """Filter for a result's line: on a changed line, or on a loop/def header whose lines touch one."""
+    def keep(line):
+        if line is None:
+            return False
+        line = int(line)
+        return touches(ranges, line, spans.get(line, line))
+    return keep
+
+def _filter(result, ranges, spans, findings):
+    """
+    Style issues and explanations are kept on changed lines only; performance hints,
+    complexity rows and structure findings also when they point at a loop or def that
+    contains one.
+    """
+    on_line, in_span = _keep(ranges, {}), _keep(ranges, spans)
+    out = dict(result)
+    out['pep8_issues'] = [issue for issue in result['pep8_issues'] if on_line(issue[0])]
+    out['explanations'] = [row for row in result['explanations'] if on_line(row[0])]
+    hints = [(ln, text) for ln, text in zip(result['performance_lines'], result['performance_hints']) if in_span(ln)]
+    out['performance_hints'] = [text for _, text in hints]
+    out['performance_lines'] = [ln for ln, _ in hints]
+    out['complexity'] = [row for row in result['complexity'] if in_span(row[0])]
+    out['structure_suggestions'] = [f"ที่บรรทัด {ln}: {text}" for ln, text in findings if in_span(ln)]
+    return out
+
+def _windows(block, ranges):
+    """
+    Line spans of a block to style-check: the whole block, or for a top-level class the
+    header and each member that touch `ranges` (each with the lines above it).
+    """
+    start, end, nodes = block
+    if len(nodes) != 1 or not isinstance(nodes[0], ast.ClassDef):
+        return [(start, end)]
+    windows = []
+    previous = start - 1
+    for member in nodes[0].body:
+        member_start = _start(member)
+        if previous < member_start - 1 and touches(ranges, previous + 1, member_start - 1):
+            windows.append((previous + 1, member_start - 1))
+        if touches(ranges, member_start, member.end_lineno):
+            windows.append((member_start, member.end_lineno))
+        previous = member.end_lineno
+    if previous < end and touches(ranges, previous + 1, end):
+        windows.append((previous + 1, end))
+    return windows
+
+def analyze_changed(code, ranges, max_line_len=79, rules=None):
+    """
+    do_full_analysis of `code` restricted to the lines in `ranges` ([(first, last)], as
+    from parse_diff or changed_lines), plus 'changed_lines'. Code that does not parse is
+    analyzed in full (with auto-fix) and filtered the same way.
+    """
+    ranges = sorted(tuple(r) for r in ranges)
+    with stage("normalize"):
+        code_norm = normalize_indentation(code)
+    with stage("parse"):
+        tree, _ = safe_parse(code_norm)
+    if tree is None:
+        result = do_full_analysis(code, max_line_len=max_line_len, rules=rules)
+        result = _filter(result, ranges, {}, [])
+        result['changed_lines'] = ranges
+        return result
+
+    lines = code_norm.splitlines()
+    blocks = split_blocks(tree, len(lines))
+    changed = [index for index, (start, end, _) in enumerate(blocks) if touches(ranges, start, end)]
+    # style checks are per line and statement: they run on the changed statements below, not per block
+    ast_rules = frozenset(rule for rule in resolve(rules) if not rule.startswith("pep8."))
+    selected = set(changed)
+    pruned = {}
+    analyzed = {}  # index -> analyze_block data
+    assigners = None  # global -> indexes of the blocks assigning it, built on first need
+    with stage("diff.analyze"):
+        while True:
+            module_kinds = {}
+            for index in sorted(selected):
+                start, end, nodes = blocks[index]
+                data = analyzed.get(index)
+                if data is None or any(module_kinds.get(name) != kind for name, kind in data['perf']['kind_deps'].items()):
+                    if index not in pruned:
+                        pruned[index] = _prune(nodes, ranges)
+                    data = analyzed[index] = analyze_block(lines[start - 1:end], start, pruned[index], index == 0,
+                                                           rules=ast_rules, module_kinds=dict(module_kinds))
+                module_kinds.update(data['perf']['module_kinds'])
+            # globals whose kinds came from statements not analyzed yet: analyze the last one assigning each
+            if assigners is None and any(data['perf']['kind_deps'] for data in analyzed.values()):
+                assigners = {}
+                for index, (_, _, nodes) in enumerate(blocks):
+                    for name in _assigned(nodes):
+                        assigners.setdefault(name, []).append(index)
+            context = set()
+            for index in selected:
+                for name in analyzed[index]['perf']['kind_deps']:
+                    candidates = (assigners or {}).get(name, ())
+                    position = bisect.bisect_left(candidates, index)
+                    if position and candidates[position - 1] not in selected:
+                        context.add(candidates[position - 1])
+            if not context:
+                break
+            selected |= context
+    with stage("pep8"):
+        pep8_issues = []
+        for index in changed:
+            for first, last in _windows(blocks[index], ranges):
+                window = "\n".join(lines[first - 1:last])
+                pep8_issues.extend((first - 1 + ln, key, msg)
+                                   for ln, key, msg in pep8_checks(window, max_line=max_line_len, rules=rules))
+
+    parts = [(blocks[index][0], analyzed[index]) for index in sorted(selected)]
+    with stage("diff.filter"):
+        result = merge_blocks(code_norm, parts, ast_rules)
+        result['pep8_issues'] = pep8_issues
+        findings = [(start + ln, text) for start, data in parts for ln, text in data['structure_findings']]
+        spans = _spans(node for index in selected for node in pruned[index])
+        result = _filter(result, ranges, spans, findings)
+    result['rewritten_code'] = None  # only part of the module was unparsed
+    result['changed_lines'] = ranges
+    return result
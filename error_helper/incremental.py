@@ -0,0 +1,217 @@
+"""
+Incremental re-analysis at top-level-statement granularity.
+
+The module is split into blocks, one per top-level statement (`tree.body`, as in
+suggest_structure), each owning the source lines from the end of the previous block
+to its own end (so leading comments and decorators belong to it). A block's PEP8
+issues (style and naming), explanations, performance raw data and unparsed text
+are stored with line numbers relative to the block start, keyed by a hash of the
+block's text, and rebased when reused. After an edit only the changed
+blocks run through the analyzers; whole-module checks (structure, main guard, the
+recursion call graph, the ranking of performance hints) are recomputed from the merged
+data. The kinds the performance analyzer infers for globals flow from block to block:
+a block is also re-run when a global it relies on changed kind earlier in the file.
+Output is identical to do_full_analysis.
+"""
+import ast
+import hashlib
+import threading
+from collections import OrderedDict
+
+from error_helper.core import (
+    ANALYZER_VERSION,
+    AnalysisEngine,
+    ExplainAnalyzer,
+    PerformanceAnalyzer,
+    StructureAnalyzer,
+    format_unparsed,
+    iter_full_analysis,
+    normalize_indentation,
+    safe_parse,
+)
+from error_helper.instrument import stage
+from error_helper.pep8 import pep8_checks
+from error_helper.rules import selection_key
+from error_helper.source import SourceIndex
+
+DEF_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+def split_blocks(tree, n_lines):
+    """
+    Group tree.body into blocks of (start_line, end_line, nodes). Statements that share
+    a line (`a = 1; b = 2`) land in the same block. Trailing lines join the last block.
+    """
+    blocks = []
+    start = 1
+    for node in tree.body:
+        if blocks and node.lineno <= blocks[-1][1]:
+            blocks[-1][1] = max(blocks[-1][1], node.end_lineno)
+            blocks[-1][2].append(node)
+            continue
+        blocks.append([start, node.end_lineno, [node]])
+        start = node.end_lineno + 1
+    if blocks:
+        blocks[-1][1] = max(blocks[-1][1], n_lines)
+    elif n_lines:
+        blocks.append([1, n_lines, []])
+    return [tuple(b) for b in blocks]
+
+def _unparse_block(nodes, first):
+    # mirrors ast.unparse(Module): docstring handling for the first statement and a
+    # blank line before every def/class that is not at the very top
+    parts = []
+    for node in nodes:
+        if first:
+            text = ast.unparse(ast.Module(body=[node], type_ignores=[]))
+            first = False
+        else:
+            text = ast.unparse(node)
+            if isinstance(node, DEF_NODES):
+                text = "\n" + text
+        parts.append(text)
+    return "\n".join(parts)
+
+def analyze_block(block_lines, start, nodes, first, max_line_len=79, rules=None, module_kinds=None):
+    """
+    Analyze one block; every line number in the result is relative (0 = block start).
+    `module_kinds` are the kinds of globals inferred from the blocks before it.
+    """
+    source = SourceIndex("\n".join(block_lines), first_lineno=start)
+    explain, perf, structure = analyzers = (
+        ExplainAnalyzer(source, rules), PerformanceAnalyzer(source, rules, module_kinds), StructureAnalyzer(rules))
+    engine = AnalysisEngine()
+    for analyzer in analyzers:
+        analyzer.register(engine)
+    for node in nodes:
+        engine.run(node)
+    structure.add_top_level(nodes)
+    return {
+        'pep8_issues': [(ln - 1, key, msg)
+                        for ln, key, msg in pep8_checks("\n".join(block_lines), max_line=max_line_len, rules=rules)],
+        'explanations': [(ln - start, text) for ln, text in explain.results()],
+        'perf': perf.block_data(start),
+        'func_count': structure.func_count,
+        'long_funcs': structure.long_funcs,
+        'structure_findings': [(ln - start, text) for ln, text in structure.findings],
+        'top_level': structure.top_level,
+        'main_guard': structure.main_guard,
+        'unparsed': _unparse_block(nodes, first) if nodes else "",
+    }
+
+class IncrementalAnalyzer:
+    """
+    Drop-in replacement for do_full_analysis that reuses per-block results across calls;
+    the result also has 'last_run', this call's block counts {'blocks', 'reused',
+    'recomputed'}. Thread-safe; the block store is a bounded LRU shared by every caller.
+    """
+    def __init__(self, max_blocks=20000):
+        self.max_blocks = max_blocks
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _fingerprint(self, block_lines, first, max_line_len, rules):
+        h = hashlib.sha256(f"{ANALYZER_VERSION}\0{max_line_len}\0{int(first)}\0{selection_key(rules)}\0".encode("utf-8"))
+        for line in block_lines:
+            h.update(line.encode("utf-8", "surrogatepass"))
+            h.update(b"\n")
+        return h.digest()
+
+    def _lookup(self, key):
+        with self._lock:
+            data = self._blocks.get(key)
+            if data is not None:
+                self._blocks.move_to_end(key)
+            return data
+
+    def _store(self, key, data):
+        with self._lock:
+            self._blocks[key] = data
+            self._blocks.move_to_end(key)
+            while len(self._blocks) > self.max_blocks:
+                self._blocks.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._blocks.clear()
+
+    def analyze(self, code, max_line_len=79, rules=None):
+        out = {}
+        for part in self.iter_analyze(code, max_line_len=max_line_len, rules=rules):
+            out.update(part)
+        return out
+
+    def iter_analyze(self, code, max_line_len=79, rules=None):
+        """
+        analyze() in stages, like core.iter_full_analysis: the normalized code and syntax
+        error first, then the rest (with 'last_run') once every block is done.
+        """
+        with stage("normalize"):
+            code_norm = normalize_indentation(code)
+        with stage("parse"):
+            tree, _ = safe_parse(code_norm)
+        if tree is None:
+            # broken code goes through auto-fix; nothing block-level to reuse
+            yield from iter_full_analysis(code, max_line_len=max_line_len, rules=rules)
+            yield {'last_run': {'blocks': 0, 'reused': 0, 'recomputed': 0}}
+            return
+        yield {'normalized_code': code_norm, 'syntax_error': None}
+
+        lines = code_norm.splitlines()
+        blocks = split_blocks(tree, len(lines))
+        parts = []
+        module_kinds = {}
+        reused = 0
+        for index, (start, end, nodes) in enumerate(blocks):
+            block_lines = lines[start - 1:end]
+            first = index == 0
+            key = self._fingerprint(block_lines, first, max_line_len, rules)
+            data = self._lookup(key)
+            if data is not None and any(module_kinds.get(name) != kind
+                                        for name, kind in data['perf']['kind_deps'].items()):
+                data = None  # an earlier block changed what this one infers about a global
+            if data is None:
+                with stage("block.analyze"):
+                    data = analyze_block(block_lines, start, nodes, first, max_line_len=max_line_len, rules=rules,
+                                         module_kinds=dict(module_kinds))
+                self._store(key, data)
+            else:
+                reused += 1
+            parts.append((start, data))
+            module_kinds.update(data['perf']['module_kinds'])
+        result = merge_blocks(code_norm, parts, rules)
+        result['last_run'] = {'blocks': len(blocks), 'reused': reused, 'recomputed': len(blocks) - reused}
+        yield result
+
+def merge_blocks(code_norm, parts, rules=None):
+    """
+    The do_full_analysis result for parsed code from [(start_line, analyze_block data)]
+    in line order: line numbers are rebased, whole-module checks run once over the
+    merged data.
+    """
+    pep8_issues, explanations, unparsed = [], [], []
+    perf, structure = PerformanceAnalyzer(rules=rules), StructureAnalyzer(rules)
+    for start, data in parts:
+        # rebase relative line numbers onto this block's position
+        pep8_issues.extend((start + ln, k, m) for ln, k, m in data['pep8_issues'])
+        explanations.extend((start + ln, text) for ln, text in data['explanations'])
+        perf.merge_block(data['perf'], start)
+        structure.func_count += data['func_count']
+        structure.long_funcs.extend(data['long_funcs'])
+        structure.findings.extend((start + ln, text) for ln, text in data['structure_findings'])
+        structure.top_level += data['top_level']
+        structure.main_guard = structure.main_guard or data['main_guard']
+        if data['unparsed']:
+            unparsed.append(data['unparsed'])
+    with stage("results"):
+        ranked = perf.ranked()
+        return {
+            'normalized_code': code_norm,
+            'syntax_error': None,
+            'pep8_issues': pep8_issues,
+            'explanations': explanations,
+            'performance_hints': [text for _, text in ranked],
+            'performance_lines': [ln for ln, _ in ranked],
+            'complexity': perf.complexity_rows(),
+            'structure_suggestions': structure.results(),
+            'rewritten_code': format_unparsed("\n".join(unparsed)),
+        }
@@ -0,0 +1,163 @@
+"""
+Per-stage instrumentation: wall time, call counts and (optionally) tracemalloc peak.
+
+Code marks stages with `with stage("parse"): ...`. Nothing is recorded unless a
+recorder is active for the current context (thread / Streamlit session):
+
+    with recording(trace_memory=True) as rec:
+        do_full_analysis(code)
+    rec.summary(); rec.to_json(); rec.to_chrome_trace()
+
+When no recorder is active `stage()` is one ContextVar lookup returning a shared
+no-op context manager, so the instrumented code paths cost next to nothing.
+"""
+import contextlib
+import contextvars
+import time
+
+_current = contextvars.ContextVar("error_helper_recorder", default=None)
+_NULL = contextlib.nullcontext()
+
+def current():
+    """The active Recorder, or None."""
+    return _current.get()
+
+def stage(name):
+    rec = _current.get()
+    if rec is None:
+        return _NULL
+    return rec.stage(name)
+
+class _Frame:
+    __slots__ = ("name", "start", "mem_start", "child_peak")
+
+    def __init__(self, name, start, mem_start):
+        self.name = name
+        self.start = start
+        self.mem_start = mem_start
+        self.child_peak = 0
+
+class Recorder:
+    """Collects stage events and aggregated counters for one analysis/render cycle."""
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.events = []      # (name, start_s, duration_s, depth, peak_bytes or None)
+        self.counters = {}    # name -> [calls, total_s]
+        self._stack = []
+        self._origin = time.perf_counter()
+        self._started_tracing = False
+
+    def start(self):
+        if self.trace_memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+
+    def stop(self):
+        if self._started_tracing:
+            import tracemalloc
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        mem_start = None
+        if self.trace_memory:
+            import tracemalloc
+            current_mem, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # resetting the peak below would lose what the parent has seen so far
+                parent = self._stack[-1]
+                parent.child_peak = max(parent.child_peak, peak)
+            tracemalloc.reset_peak()
+            mem_start = current_mem
+        frame = _Frame(name, time.perf_counter(), mem_start)
+        self._stack.append(frame)
+        try:
+            yield self
+        finally:
+            end = time.perf_counter()
+            self._stack.pop()
+            peak_bytes = None
+            if self.trace_memory:
+                import tracemalloc
+                peak = max(tracemalloc.get_traced_memory()[1], frame.child_peak)
+                peak_bytes = max(0, peak - frame.mem_start)
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent.child_peak = max(parent.child_peak, peak)
+            self.events.append((name, frame.start - self._origin, end - frame.start, len(self._stack), peak_bytes))
+            self.count(name, end - frame.start)
+
+    def count(self, name, seconds, calls=1):
+        entry = self.counters.get(name)
+        if entry is None:
+            self.counters[name] = [calls, seconds]
+        else:
+            entry[0] += calls
+            entry[1] += seconds
+
+    def merge(self, events, counters, start):
+        """
+        Add the events and counters of another recorder (e.g. one in a worker process),
+        whose origin was at perf_counter time `start` here, nested under the open stages.
+        """
+        offset, depth = start - self._origin, len(self._stack)
+        self.events.extend((name, begin + offset, duration, level + depth, peak)
+                           for name, begin, duration, level, peak in events)
+        for name, (calls, total) in counters.items():
+            self.count(name, total, calls)
+
+    def summary(self):
+        """Rows per stage/counter name: calls, total and mean ms, max peak KiB (first-seen order)."""
+        peaks = {}
+        for name, _, _, _, peak in self.events:
+            if peak is not None:
+                peaks[name] = max(peaks.get(name, 0), peak)
+        rows = []
+        for name, (calls, total) in self.counters.items():
+            rows.append({
+                'stage': name,
+                'calls': calls,
+                'total_ms': round(total * 1000, 3),
+                'mean_ms': round(total * 1000 / calls, 4) if calls else 0.0,
+                'peak_kib': round(peaks[name] / 1024, 1) if name in peaks else None,
+            })
+        return rows
+
+    def to_json(self):
+        import json
+
+        return json.dumps({'trace_memory': self.trace_memory, 'stages': self.summary()}, ensure_ascii=False, indent=1)
+
+    def to_chrome_trace(self):
+        """chrome://tracing / Perfetto "Trace Event Format" (complete events, microseconds)."""
+        import json
+
+        events = []
+        for name, start, duration, depth, peak in self.events:
+            event = {'name': name, 'cat': name.split(".", 1)[0], 'ph': "X", 'pid': 1, 'tid': 1,
+                     'ts': round(start * 1e6, 3), 'dur': round(duration * 1e6, 3), 'args': {'depth': depth}}
+            if peak is not None:
+                event['args']['peak_bytes'] = peak
+            events.append(event)
+        # aggregated counters (e.g. per-analyzer callback time inside the single walk)
+        staged = {name for name, *_ in self.events}
+        for name, (calls, total) in self.counters.items():
+            if name not in staged:
+                events.append({'name': name, 'ph': "C", 'pid': 1, 'ts': 0,
+                               'args': {'calls': calls, 'total_ms': round(total * 1000, 3)}})
+        return json.dumps({'traceEvents': events, 'displayTimeUnit': "ms"})
+
+@contextlib.contextmanager
+def recording(trace_memory=False):
+    """Activate a fresh Recorder for the current context."""
+    rec = Recorder(trace_memory=trace_memory)
+    rec.start()
+    token = _current.set(rec)
+    try:
+        yield rec
+    finally:
+        _current.reset(token)
+        rec.stop()
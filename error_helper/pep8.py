@@ -0,0 +1,258 @@
+"""
+Streaming PEP8 / style checker built on `tokenize`.
+
+Works as a generator over a string, a text or binary file object, or an mmap, reading
+one physical line at a time, so memory stays flat on generated/vendored files of
+hundreds of MB. Comments and `=` are recognised from tokens (a `#` inside a string is
+not a comment), naming rules come from the token stream (no `ast.parse`), and every
+pattern is compiled once at import.
+
+If the source stops tokenizing (unbalanced brackets, bad dedent) the remaining lines
+still get the plain per-line checks.
+
+Each check is a pep8.* rule (see error_helper.rules); disabled rules are not run, and
+when only plain line rules are enabled the source is not tokenized at all.
+"""
+import io
+import re
+import tokenize
+
+from error_helper.rules import REGISTRY, define_rule, resolve
+
+snake_case_re = re.compile(r"^[a-z_][a-z0-9_]*$")
+camel_case_re = re.compile(r"^[A-Z][A-Za-z0-9]+$")
+
+# operators that want a space on at least one side ('==' is left to taste)
+ASSIGN_OPS = frozenset({
+    "=", ":=", "+=", "-=", "*=", "/=", "//=", "%=", "**=", "@=", ">>=", "<<=", "&=", "^=", "|=",
+    "<=", ">=", "!=",
+})
+# after `<keyword> ...:` a new simple statement may follow on the same line
+COMPOUND_KEYWORDS = frozenset({
+    "if", "elif", "else", "for", "while", "try", "except", "finally", "with", "class", "def",
+})
+SKIP_TOKENS = frozenset({tokenize.INDENT, tokenize.DEDENT, tokenize.ENCODING, tokenize.ENDMARKER})
+
+def _text_readline(source):
+    """Return a readline() producing str lines for a str, a text/binary file object or an mmap."""
+    if isinstance(source, str):
+        return io.StringIO(source).readline
+    if isinstance(source, io.TextIOBase):
+        return source.readline
+    # bytes (binary file, mmap): honour PEP 263 coding cookies / BOM like the interpreter
+    readline = source.readline
+    encoding, first_lines = tokenize.detect_encoding(readline)
+    pending = list(first_lines)
+
+    def text_readline():
+        line = pending.pop(0) if pending else readline()
+        return line.decode(encoding, errors="replace")
+    return text_readline
+
+class _LineFacts:
+    """What the token stream learned about one physical line before it is reported."""
+    __slots__ = ("text", "check_indent", "comment_col", "bad_assign", "names")
+
+    def __init__(self, text):
+        self.text = text
+        # only lines where a statement or a comment starts get the indentation check
+        # (not continuation lines or the inside of multi-line strings)
+        self.check_indent = False
+        self.comment_col = None
+        self.bad_assign = False
+        self.names = []
+
+# -----------------------
+# Rules: line checks run from the per-line facts, in this order
+# -----------------------
+define_rule("pep8.line-too-long", "บรรทัดยาวเกินกำหนด", tokens=("line",))
+define_rule("pep8.trailing-whitespace", "ช่องว่างท้ายบรรทัด", tokens=("line",))
+define_rule("pep8.indentation", "ย่อหน้าไม่เป็น multiple ของ 4", tokens=("line", "NEWLINE", "NL", "COMMENT", "OP", "NAME"))
+define_rule("pep8.whitespace-before-comment", "สองช่องว่างก่อน comment", tokens=("line", "COMMENT"))
+define_rule("pep8.whitespace", "ไม่มีช่องว่างรอบ =", tokens=("OP",))
+define_rule("pep8.var-name", "ชื่อตัวแปรไม่เป็น snake_case", tokens=("NAME", "OP"))
+define_rule("pep8.func-name", "ชื่อฟังก์ชันไม่เป็น snake_case", tokens=("NAME",))
+define_rule("pep8.class-name", "ชื่อคลาสไม่เป็น CamelCase", tokens=("NAME",))
+
+def _line_too_long(lineno, facts, max_line):
+    if len(facts.text) > max_line:
+        return (lineno, "line-too-long", f"บรรทัดยาวเกิน {max_line} ตัวอักษร ({len(facts.text)})")
+
+def _trailing_whitespace(lineno, facts, max_line):
+    if facts.text.rstrip() != facts.text:
+        return (lineno, "trailing-whitespace", "มีช่องว่างท้ายบรรทัด")
+
+def _indentation(lineno, facts, max_line):
+    # indent not multiple of 4?
+    line = facts.text
+    if facts.check_indent and line.strip():
+        leading = len(line) - len(line.lstrip(' '))
+        if leading % 4 != 0:
+            return (lineno, "indentation", "การย่อหน้าไม่เป็น multiple ของ 4 ช่อง (PEP8 แนะนำ 4)")
+
+def _whitespace_before_comment(lineno, facts, max_line):
+    # two spaces before inline comment?
+    if facts.comment_col is not None:
+        code_part = facts.text[:facts.comment_col]
+        if code_part.strip() and code_part.endswith("  "):
+            return (lineno, "whitespace-before-comment", "มีสองช่องว่างก่อน comment (แนะนำ 2 คือ acceptable แต่เช็คให้)")
+
+def _whitespace(lineno, facts, max_line):
+    if facts.bad_assign:
+        return (lineno, "whitespace", "อาจไม่มีช่องว่างรอบเครื่องหมาย =")
+
+LINE_CHECKS = (
+    ("pep8.line-too-long", _line_too_long),
+    ("pep8.trailing-whitespace", _trailing_whitespace),
+    ("pep8.indentation", _indentation),
+    ("pep8.whitespace-before-comment", _whitespace_before_comment),
+    ("pep8.whitespace", _whitespace),
+)
+NAME_RULES = ("pep8.var-name", "pep8.func-name", "pep8.class-name")
+
+def _report(lineno, facts, max_line, checks):
+    for check in checks:
+        issue = check(lineno, facts, max_line)
+        if issue is not None:
+            yield issue
+    yield from facts.names
+
+def _iter_line_issues(readline, max_line, checks):
+    # no enabled rule needs tokens: plain per-line checks, no tokenize
+    lineno = 0
+    while True:
+        line = readline()
+        if not line:
+            return
+        lineno += 1
+        yield from _report(lineno, _LineFacts(line.rstrip("\r\n")), max_line, checks)
+
+def iter_pep8_issues(source, max_line=79, rules=None):
+    """
+    Yield (lineno, code, message) in line order for `source` (str, file object or mmap),
+    for the enabled pep8.* rules of `rules` (None = defaults).
+    """
+    enabled = resolve(rules)
+    checks = [check for rule_id, check in LINE_CHECKS if rule_id in enabled]
+    names = {rule_id.split(".", 1)[1] for rule_id in NAME_RULES if rule_id in enabled}
+    if not checks and not names:
+        return  # every style rule is off: nothing to read
+    readline = _text_readline(source)
+    if not any(REGISTRY[rule_id].tokens != ("line",) for rule_id in enabled if rule_id.startswith("pep8.")):
+        yield from _iter_line_issues(readline, max_line, checks)
+        return
+    check_assign = "pep8.whitespace" in enabled
+    lines = {}
+    read = 0
+
+    def recording_readline():
+        nonlocal read
+        line = readline()
+        if line:
+            read += 1
+            lines[read] = _LineFacts(line.rstrip("\r\n"))
+        return line
+
+    def flush(upto):
+        # `lines` holds only unreported lines, in insertion (= line) order
+        while lines:
+            lineno = next(iter(lines))
+            if lineno > upto:
+                break
+            yield from _report(lineno, lines.pop(lineno), max_line, checks)
+
+    flushed = 0
+    last_row = 0
+    depth = 0
+    prev = None               # previous code token of the logical line: (string, end)
+    stmt_start = True         # next code token starts a simple statement
+    line_keyword = None       # first token of the logical line, if a NAME
+    target = None             # NAME that started a statement, until we see what follows
+    def_kind = None           # 'def'/'class' just seen, waiting for the name
+    glued_assign = None       # (row, col) an operator ended at with no space before it
+    try:
+        for tok in tokenize.generate_tokens(recording_readline):
+            ttype, tstr, (srow, scol), end, _ = tok
+            if srow - 1 > flushed:
+                yield from flush(srow - 1)
+                flushed = srow - 1
+            last_row = end[0]
+            if glued_assign is not None:
+                if glued_assign == (srow, scol) and srow in lines:
+                    lines[srow].bad_assign = True
+                glued_assign = None
+            if ttype in SKIP_TOKENS:
+                continue
+            if ttype == tokenize.COMMENT:
+                facts = lines.get(srow)
+                if facts is not None:
+                    facts.comment_col = scol
+                    if not facts.text[:scol].strip():
+                        facts.check_indent = True
+                continue
+            if ttype in (tokenize.NEWLINE, tokenize.NL):
+                if ttype == tokenize.NEWLINE or depth == 0:
+                    prev, stmt_start, line_keyword, target, def_kind = None, True, None, None, None
+                continue
+
+            if prev is None and srow in lines:
+                lines[srow].check_indent = True
+                line_keyword = tstr if ttype == tokenize.NAME else None
+
+            if ttype == tokenize.OP:
+                if tstr in "([{":
+                    depth += 1
+                elif tstr in ")]}":
+                    depth = max(0, depth - 1)
+                # keyword arguments / defaults are written without spaces
+                if check_assign and tstr in ASSIGN_OPS and prev is not None and prev[1] == (srow, scol) and not (tstr == "=" and depth > 0):
+                    glued_assign = end
+                if tstr == "=" and depth == 0 and target is not None:
+                    name, row = target
+                    if "var-name" in names and not snake_case_re.match(name) and row in lines:
+                        lines[row].names.append((row, "var-name", f"ชื่อตัวแปร '{name}' ไม่เป็น snake_case"))
+                    stmt_start = True  # chained targets: `a = b = 1`
+                elif depth == 0 and (tstr == ";" or (tstr == ":" and line_keyword in COMPOUND_KEYWORDS)):
+                    stmt_start, line_keyword = True, None
+                else:
+                    stmt_start = False
+                target = None
+            else:
+                if def_kind is not None and ttype == tokenize.NAME:
+                    facts = lines.get(srow)
+                    if facts is not None:
+                        if def_kind == "def" and "func-name" in names and not snake_case_re.match(tstr):
+                            facts.names.append((srow, "func-name", f"ชื่ิอฟังก์ชัน '{tstr}' ไม่เป็น snake_case"))
+                        elif def_kind == "class" and "class-name" in names and not camel_case_re.match(tstr):
+                            facts.names.append((srow, "class-name", f"ชื่อคลาส '{tstr}' ไม่เป็น CamelCase"))
+                    def_kind = None
+                elif ttype == tokenize.NAME and tstr in ("def", "class"):
+                    # `async def` is not a FunctionDef; the naming rule covers plain def only
+                    def_kind = None if (tstr == "def" and prev is not None and prev[0] == "async") else tstr
+                target = (tstr, srow) if (stmt_start and ttype == tokenize.NAME) else None
+                stmt_start = False
+            prev = (tstr, end)
+    except (tokenize.TokenError, SyntaxError):
+        # lines tokenize never reached (or gave up on) get the plain per-line checks
+        while recording_readline():
+            pass
+        for lineno, facts in lines.items():
+            if lineno > last_row:
+                facts.check_indent = True
+    yield from flush(read)
+
+def check_file(path, max_line=79, rules=None):
+    """Stream issues for a file on disk via mmap, without loading it into memory."""
+    import mmap
+
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return
+        with mm:
+            yield from iter_pep8_issues(mm, max_line=max_line, rules=rules)
+
+def pep8_checks(code, max_line=79, rules=None):
+    """All style issues for `code` as a list, in line order."""
+    return list(iter_pep8_issues(code, max_line=max_line, rules=rules))
@@ -0,0 +1,169 @@
+"""
+Rule registry: every check the analyzers make is a named rule that can be switched off.
+
+A rule is declared once with `define_rule()` and implemented by one or more handlers:
+
+- AST rules (groups explain / perf / structure): analyzer methods marked with
+  `@handles(rule_id, node_types)`. An analyzer registers the handlers of enabled rules
+  only, and the engine compiles them into one node-type -> callbacks table, so a walk
+  costs O(nodes) + O(enabled handlers matching each node), whatever else is registered.
+- token/line rules (group pep8): declared with the token kinds they look at; the
+  checker builds its per-line table from the enabled ones and skips tokenizing when
+  none of them needs tokens.
+
+Plugins add rules without touching the analyzers:
+
+    @register_rule("perf.sleep-in-loop", "time.sleep ใน loop", nodes=ast.Call)
+    def sleep_in_loop(node, ctx, report):
+        if ctx.loop_depth and ...:
+            report(node.lineno, "เรียก time.sleep ใน loop")
+
+`report(lineno, text)` adds to the rule group's results (explanations, performance
+hints or structure suggestions).
+
+A selection of enabled rules is a frozenset of ids; None means the defaults. It comes
+from the sidebar, the batch command line or a config file (see load_config).
+"""
+import os
+
+GROUPS = ("pep8", "explain", "perf", "structure")
+CONFIG_FILES = ("error_helper.toml", "pyproject.toml")
+
+class Rule:
+    __slots__ = ("id", "group", "description", "nodes", "tokens", "default", "callback")
+
+    def __init__(self, rule_id, description, nodes=(), tokens=(), default=True, callback=None):
+        group = rule_id.split(".", 1)[0]
+        if group not in GROUPS or "." not in rule_id:
+            raise ValueError(f"rule id must look like '<group>.<name>' with group in {GROUPS}: {rule_id!r}")
+        self.id = rule_id
+        self.group = group
+        self.description = description
+        self.nodes = nodes if isinstance(nodes, tuple) else (nodes,)
+        self.tokens = tuple(tokens)
+        self.default = default
+        self.callback = callback
+
+REGISTRY = {}  # rule id -> Rule, in definition order
+
+def define_rule(rule_id, description, nodes=(), tokens=(), default=True, callback=None):
+    if rule_id in REGISTRY:
+        raise ValueError(f"rule {rule_id!r} is already defined")
+    rule = REGISTRY[rule_id] = Rule(rule_id, description, nodes, tokens, default, callback)
+    return rule
+
+def handles(rule_ids, node_types):
+    """
+    Mark an analyzer method as a handler for `node_types`, needed by one rule id or by a
+    tuple of them (shared bookkeeping); it is registered if any of them is enabled.
+    """
+    rule_ids = rule_ids if isinstance(rule_ids, tuple) else (rule_ids,)
+    node_types = node_types if isinstance(node_types, tuple) else (node_types,)
+    for rule_id in rule_ids:
+        rule = REGISTRY[rule_id]
+        rule.nodes += tuple(t for t in node_types if t not in rule.nodes)
+
+    def mark(method):
+        method.rule = (rule_ids, node_types)
+        return method
+    return mark
+
+def handlers(cls):
+    """[(rule_ids, node_types, method name)] of `cls` and its bases, in definition order."""
+    found = cls.__dict__.get("_rule_handlers")
+    if found is None:
+        found = []
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if getattr(value, "rule", None) is not None:
+                    found.append((value.rule[0], value.rule[1], name))
+        cls._rule_handlers = found
+    return found
+
+def register_rule(rule_id, description, nodes, default=True):
+    """Decorator for plugin rules `fn(node, ctx, report)` on AST `nodes`."""
+    def register(fn):
+        define_rule(rule_id, description, nodes=nodes, default=default, callback=fn)
+        return fn
+    return register
+
+def plugin_rules(group, enabled):
+    """Enabled plugin rules of `group`, in definition order."""
+    return [rule for rule in REGISTRY.values()
+            if rule.callback is not None and rule.group == group and rule.id in enabled]
+
+def all_rules():
+    """Every defined rule (importing the built-in ones first)."""
+    import error_helper.core  # noqa: F401  (defines the built-in rules)
+    return list(REGISTRY.values())
+
+def default_rules():
+    return frozenset(rule.id for rule in REGISTRY.values() if rule.default)
+
+def resolve(rules):
+    """The enabled ids for a selection (None = defaults)."""
+    return default_rules() if rules is None else rules
+
+def select(disable=(), enable=(), base=None):
+    """
+    Enabled ids after switching off `disable` and on `enable` (rule ids or whole groups,
+    e.g. "explain"), starting from `base` (None = defaults). Unknown names raise ValueError.
+    """
+    enabled = set(resolve(base))
+    for names, on in ((disable, False), (enable, True)):
+        for name in names:
+            if name in GROUPS:
+                ids = [rule.id for rule in REGISTRY.values() if rule.group == name]
+            elif name in REGISTRY:
+                ids = [name]
+            else:
+                raise ValueError(f"ไม่รู้จัก rule '{name}'")
+            if on:
+                enabled.update(ids)
+            else:
+                enabled.difference_update(ids)
+    return frozenset(enabled)
+
+def selection_key(rules):
+    """Stable text for cache keys; the default selection (however spelled) is ''."""
+    if rules is None or rules == default_rules():
+        return ""
+    return ",".join(sorted(rules))
+
+def find_config(start="."):
+    """The nearest error_helper.toml, or pyproject.toml with a [tool.error_helper] table, from `start` upwards."""
+    directory = os.path.abspath(start)
+    while True:
+        for name in CONFIG_FILES:
+            path = os.path.join(directory, name)
+            if os.path.isfile(path) and (name != "pyproject.toml" or _has_tool_table(path)):
+                return path
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return None
+        directory = parent
+
+def _has_tool_table(path):
+    with open(path, encoding="utf-8") as f:
+        return any(line.strip() == "[tool.error_helper]" for line in f)
+
+def load_config(path):
+    """
+    Rule selection from a TOML (error_helper.toml, or pyproject.toml's [tool.error_helper])
+    or JSON file with optional `disable` and `enable` lists:
+
+        disable = ["explain.call", "pep8.line-too-long"]
+        enable = []
+    """
+    if path.endswith(".json"):
+        import json
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    else:
+        import tomllib  # Python 3.11+
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+        if os.path.basename(path) == "pyproject.toml":
+            data = data.get("tool", {}).get("error_helper", {})
+    all_rules()
+    return select(disable=data.get("disable", ()), enable=data.get("enable", ()))
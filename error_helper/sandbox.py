@@ -0,0 +1,284 @@
+"""
+Resource-bounded analysis in worker processes.
+
+A pathological paste (expressions nested thousands deep, a multi-MB literal) can make
+ast.parse raise RecursionError or crash outright, or keep the analyzers busy for
+seconds. The page therefore hands analysis to a small pool of worker processes:
+
+- every job runs under a CPU-time limit (RLIMIT_CPU, surfaced as an exception in the
+  worker) and a wall-clock limit enforced by the parent, which kills the worker;
+- every worker runs under an address-space limit (RLIMIT_AS), so a runaway allocation
+  is a MemoryError in that worker rather than the server running out of memory;
+- a new submission from the same session cancels the one still queued or running;
+- stages that finished before a limit hit (see core.iter_full_analysis) are returned,
+  with `incomplete` set to the reason.
+
+Each worker keeps an IncrementalAnalyzer (error_helper.incremental), so an edit
+re-analyzes only the changed blocks, as in-process; a finished job's result carries
+its block counts as 'last_run'. When a recorder is active in the calling context
+(error_helper.instrument), the worker records the same stages and the pool merges them
+into it.
+
+Workers are started with "spawn" and import only error_helper.core and the incremental
+analyzer (see error_helper.startup for that cost). The resource limits need a POSIX
+system; elsewhere only the wall-clock limit applies.
+"""
+import contextlib
+import itertools
+import threading
+import time
+
+from error_helper.instrument import current
+
+DEFAULT_WORKERS = 2
+CPU_SECONDS = 5
+WALL_SECONDS = 10
+MEMORY_MB = 1024
+POLL_SECONDS = 0.05
+
+class CPULimitExceeded(Exception):
+    pass
+
+def _on_xcpu(signum, frame):
+    raise CPULimitExceeded()
+
+def _set_cpu_limit(resource, seconds):
+    used = resource.getrusage(resource.RUSAGE_SELF)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    # RLIMIT_CPU counts the whole process, so the budget is relative to what it has used so far
+    soft = int(used.ru_utime + used.ru_stime + seconds) + 1
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+def _clear_cpu_limit(resource):
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+def _set_memory_limit(resource, memory_mb):
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = memory_mb * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+def _worker_main(conn, memory_mb):
+    """
+    Worker loop: receive (code, max_line_len, rules, cpu_seconds, profile), send ("part",
+    dict)... then a final message; "done" carries the block counts and, when `profile` is
+    not None (the trace_memory flag), the recorded events and counters.
+    """
+    try:
+        import resource
+        import signal
+    except ImportError:  # not POSIX
+        resource = None
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _on_xcpu)
+        if memory_mb:
+            _set_memory_limit(resource, memory_mb)
+    from error_helper.incremental import IncrementalAnalyzer
+    from error_helper.instrument import recording
+
+    analyzer = IncrementalAnalyzer()  # one per process, kept across jobs
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        code, max_line_len, rules, cpu_seconds, profile = job
+        try:
+            if resource is not None:
+                _set_cpu_limit(resource, cpu_seconds)
+            profiling = contextlib.nullcontext() if profile is None else recording(trace_memory=profile)
+            with profiling as rec:
+                for part in analyzer.iter_analyze(code, max_line_len=max_line_len, rules=rules):
+                    conn.send(("part", part))
+            final = None
+            if rec is not None:
+                final = {'events': rec.events, 'counters': rec.counters}
+            conn.send(("done", final))
+        except CPULimitExceeded:
+            conn.send(("cpu", None))
+        except MemoryError:
+            conn.send(("memory", None))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+        finally:
+            if resource is not None:
+                _clear_cpu_limit(resource)
+
+class _Worker:
+    def __init__(self, ctx, memory_mb, generation):
+        self.generation = generation  # the pool's invalidate() count when started
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child, memory_mb), daemon=True)
+        self.process.start()
+        child.close()
+        self.cancelled = False
+
+    def kill(self):
+        self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+class SandboxPool:
+    """
+    Thread-safe pool of analysis workers shared by every session. `analyze()` blocks the
+    calling thread (not the other sessions) and returns what do_full_analysis would, or
+    the stages finished before a limit with `incomplete` set; a finished job also has
+    'last_run' (the worker's incremental block counts).
+    """
+    def __init__(self, workers=DEFAULT_WORKERS, cpu_seconds=CPU_SECONDS, wall_seconds=WALL_SECONDS,
+                 memory_mb=MEMORY_MB):
+        self.workers = workers
+        self.cpu_seconds = cpu_seconds
+        self.wall_seconds = wall_seconds
+        self.memory_mb = memory_mb
+        self._ctx = None
+        self._idle = []
+        self._started = 0
+        self._cond = threading.Condition()
+        self._tokens = itertools.count(1)
+        self._latest = {}    # session -> token of its newest submission
+        self._running = {}   # token -> worker
+        self._generation = 0
+
+    def _acquire(self, session, token):
+        with self._cond:
+            while True:
+                if session is not None and self._latest.get(session) != token:
+                    return None  # superseded while waiting for a worker
+                if self._idle:
+                    worker = self._idle.pop()
+                    self._running[token] = worker
+                    return worker
+                if self._started < self.workers:
+                    self._started += 1
+                    break
+                self._cond.wait(POLL_SECONDS)
+        try:
+            if self._ctx is None:
+                import multiprocessing
+                self._ctx = multiprocessing.get_context("spawn")
+            worker = _Worker(self._ctx, self.memory_mb, self._generation)
+        except BaseException:
+            with self._cond:
+                self._started -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._running[token] = worker
+        return worker
+
+    def _release(self, token, worker, reusable):
+        with self._cond:
+            self._running.pop(token, None)
+            if reusable and worker.process.is_alive() and worker.generation == self._generation:
+                self._idle.append(worker)
+            else:
+                worker.kill()
+                self._started -= 1
+            self._cond.notify()
+
+    def _incomplete(self, out, code, reason, detail=None):
+        messages = {
+            'wall': f"หยุดวิเคราะห์: ใช้เวลาเกิน {self.wall_seconds} วินาที",
+            'cpu': f"หยุดวิเคราะห์: ใช้ CPU เกิน {self.cpu_seconds} วินาที",
+            'memory': f"หยุดวิเคราะห์: ใช้หน่วยความจำเกิน {self.memory_mb} MB",
+            'crash': "worker หยุดทำงานกลางคัน (เช่น โค้ดซ้อนกันลึกเกินไป)",
+            'cancelled': "ยกเลิก เพราะมีการส่งโค้ดใหม่เข้ามา",
+            'error': f"เกิดข้อผิดพลาดระหว่างวิเคราะห์: {detail}",
+        }
+        out.setdefault('normalized_code', code)
+        out.setdefault('syntax_error', None)
+        out.setdefault('pep8_issues', [])
+        out.setdefault('explanations', [])
+        out.setdefault('performance_hints', [])
+        out.setdefault('performance_lines', [None] * len(out['performance_hints']))
+        out.setdefault('complexity', [])
+        out.setdefault('structure_suggestions', [])
+        out.setdefault('rewritten_code', None)
+        out['incomplete'] = messages[reason]
+        return out
+
+    def cancel(self, session):
+        """Cancel whatever `session` has queued or running."""
+        with self._cond:
+            token = self._latest.pop(session, None)
+            worker = self._running.get(token)
+            if worker is not None:
+                worker.cancelled = True
+
+    def analyze(self, code, max_line_len=79, rules=None, session=None):
+        token = next(self._tokens)
+        if session is not None:
+            # the session's previous job, queued or running, is no longer wanted
+            with self._cond:
+                previous = self._running.get(self._latest.get(session))
+                if previous is not None:
+                    previous.cancelled = True
+                self._latest[session] = token
+        out = {}
+        worker = self._acquire(session, token)
+        if worker is None:
+            return self._incomplete(out, code, 'cancelled')
+        reason, detail, reusable = None, None, False
+        rec = current()
+        deadline = time.monotonic() + self.wall_seconds
+        try:
+            sent = time.perf_counter()
+            worker.conn.send((code, max_line_len, rules, self.cpu_seconds, None if rec is None else rec.trace_memory))
+            while True:
+                if worker.cancelled:
+                    reason = 'cancelled'
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    reason = 'wall'
+                    break
+                if not worker.conn.poll(min(remaining, POLL_SECONDS)):
+                    continue
+                kind, payload = worker.conn.recv()
+                if kind == "part":
+                    out.update(payload)
+                    continue
+                # after a MemoryError the worker is not trusted again; it is replaced
+                reusable = kind != "memory"
+                if kind != "done":
+                    reason, detail = kind, payload
+                    break
+                if payload is not None and rec is not None:
+                    rec.merge(payload['events'], payload['counters'], sent)
+                break
+        except (EOFError, OSError):
+            reason = 'crash'
+        finally:
+            self._release(token, worker, reusable)
+            if session is not None:
+                with self._cond:
+                    if self._latest.get(session) == token:
+                        del self._latest[session]
+        if reason is not None:
+            return self._incomplete(out, code, reason, detail)
+        return out
+
+    def invalidate(self):
+        """Drop the workers' block results: idle workers are replaced now, busy ones after their job."""
+        with self._cond:
+            self._generation += 1
+            idle, self._idle = self._idle, []
+            self._started -= len(idle)
+            self._cond.notify_all()
+        for worker in idle:
+            worker.kill()
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._started -= len(idle)
+        for worker in idle:
+            worker.kill()
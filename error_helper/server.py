@@ -0,0 +1,527 @@
+"""
+HTTP/JSON service over the same core as the Streamlit page and batch mode, for editors
+and CI bots (standard library only; run it next to the page):
+
+    python -m error_helper.server --port 8765 --workers 4
+
+Endpoints (request and response bodies are JSON):
+
+- POST /analyze  {"code", "max_line_len"?, "disable"?, "enable"?} -> the do_full_analysis result
+- POST /autofix  same body -> {"fixed", "notes", "success"}
+- POST /rewrite  same body -> {"rewritten", "suggested"} (core.suggest_rewrite)
+- GET /latency   per-endpoint latency histograms
+- GET /health    pool, queue and cache counters
+
+Any POST body may instead be {"items": [{...}, ...]}, answered with {"results": [...]}
+in the same order (an item that failed is {"error": ...}).
+
+Analysis runs on a fixed pool of worker processes. Jobs wait in one queue; whenever a
+worker is free it takes the queued jobs in one hand-off (up to --batch-size, shared
+fairly between the free workers), so batching costs nothing when the service is idle
+and saves a round-trip per job under load. Identical jobs in flight run once, and
+finished results are kept in an in-process LRU (and in the persistent cache shared
+with the page and batch mode, unless --no-cache). When the queued and running jobs
+would exceed --max-pending the request is refused with 429 and Retry-After rather
+than queued without bound.
+
+Connections are HTTP/1.1 keep-alive (closed after --keepalive idle seconds, or on
+"Connection: close"); bodies need Content-Length. Workers run under an address-space
+limit but no CPU limit: this is for trusted clients on localhost or an internal
+network, not for pastes from the public (the page's SandboxPool covers that).
+"""
+import asyncio
+import bisect
+import json
+import math
+import os
+import time
+from http import HTTPStatus
+
+from error_helper.cache import AnalysisCache, result_key
+from error_helper.rules import select
+
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+BATCH_SIZE = 16
+PENDING_PER_WORKER = 16
+KEEPALIVE_SECONDS = 15
+MAX_BODY = 8 * 1024 * 1024
+MAX_LINE_LEN = 1000
+MEMORY_MB = 1024
+RETRY_AFTER = 1
+# upper bounds (ms) of the latency histogram buckets; slower requests land in the last, open one
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+OPERATIONS = ("analyze", "autofix", "rewrite")
+
+# -----------------------
+# Worker process
+# -----------------------
+_worker = {}
+
+def _init_worker(memory_mb, cache_path):
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None and memory_mb:
+        from error_helper.sandbox import _set_memory_limit
+        _set_memory_limit(resource, memory_mb)
+    _worker['cache_path'] = cache_path
+
+def _payload(op, code, max_line_len, rules):
+    from error_helper.batch import _store
+    from error_helper.core import do_full_analysis, suggest_rewrite
+    cache_path = _worker.get('cache_path')
+    store = _store(cache_path) if cache_path else None
+    if store is not None:
+        result = store.analyze(code, max_line_len=max_line_len, rules=rules)
+    else:
+        result = do_full_analysis(code, max_line_len=max_line_len, rules=rules)
+    if op == "autofix":
+        if 'auto_fixed_attempt' not in result:
+            # code that parses needs no repair (the same as core.simple_auto_fix)
+            return {'fixed': result['normalized_code'], 'notes': [], 'success': True}
+        return {'fixed': result['auto_fixed_attempt'], 'notes': result['auto_fix_notes'],
+                'success': result['auto_fix_success']}
+    if op == "rewrite":
+        rewritten, suggested = suggest_rewrite(result, code)
+        return {'rewritten': rewritten, 'suggested': suggested}
+    return result
+
+def _run_jobs(jobs):
+    """Pool worker: [(op, code, max_line_len, rules)] -> [('ok', payload) or ('error', message)]."""
+    outcomes = []
+    for job in jobs:
+        try:
+            outcomes.append(('ok', _payload(*job)))
+        except MemoryError:
+            outcomes.append(('error', "ใช้หน่วยความจำเกินกำหนด"))
+        except Exception as e:
+            outcomes.append(('error', f"{type(e).__name__}: {e}"))
+    return outcomes
+
+# -----------------------
+# Latency histogram
+# -----------------------
+class LatencyHistogram:
+    """Request counts per latency bucket, with approximate quantiles (a bucket's upper bound)."""
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= q * self.count:
+                return self.bounds[index] if index < len(self.bounds) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        edges = [str(bound) for bound in self.bounds] + ["+Inf"]
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else None,
+            'max_ms': self.max_ms,
+            'p50_ms': self.quantile(0.5),
+            'p90_ms': self.quantile(0.9),
+            'p99_ms': self.quantile(0.99),
+            'buckets': [{'le_ms': edge, 'count': n} for edge, n in zip(edges, self.counts)],
+        }
+
+# -----------------------
+# HTTP
+# -----------------------
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class _Request:
+    __slots__ = ("method", "path", "version", "headers", "body")
+
+    def __init__(self, method, path, version, headers, body):
+        self.method = method
+        self.path = path
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    def keep_alive(self):
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+async def read_request(reader, max_body=MAX_BODY):
+    """The next request on a connection, or None at end of stream. Raises HTTPError for a bad one."""
+    try:
+        line = await reader.readline()
+        while line in (b"\r\n", b"\n"):  # tolerated between requests
+            line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode("latin-1").split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "request line ไม่ถูกต้อง")
+        method, target, version = parts
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if not line:
+                return None
+            if line in (b"\r\n", b"\n"):
+                break
+            name, sep, value = line.decode("latin-1").partition(":")
+            if not sep:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "header ไม่ถูกต้อง")
+            headers[name.strip().lower()] = value.strip()
+    except (ValueError, asyncio.LimitOverrunError):
+        raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "header ยาวเกินไป") from None
+    if "transfer-encoding" in headers:
+        raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "ต้องส่ง Content-Length (ไม่รองรับ chunked)")
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length ไม่ถูกต้อง") from None
+    if length < 0:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Content-Length ไม่ถูกต้อง")
+    if length > max_body:
+        raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"body ใหญ่เกิน {max_body} ไบต์")
+    body = await reader.readexactly(length) if length else b""
+    return _Request(method.upper(), target.split("?", 1)[0], version, headers, body)
+
+def encode_response(status, payload, keep_alive, extra_headers=()):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    status = HTTPStatus(status)
+    head = [f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    head.extend(f"{name}: {value}" for name, value in extra_headers)
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+# -----------------------
+# Service
+# -----------------------
+class _Job:
+    __slots__ = ("key", "op", "code", "max_line_len", "rules", "future")
+
+    def __init__(self, key, op, code, max_line_len, rules, future):
+        self.key = key
+        self.op = op
+        self.code = code
+        self.max_line_len = max_line_len
+        self.rules = rules
+        self.future = future
+
+class AnalysisService:
+    """
+    The asyncio server. `rules` is the base rule selection (None = defaults) that
+    requests' disable/enable lists adjust; `cache_path` a DiskCache file or None.
+    """
+    def __init__(self, workers=DEFAULT_WORKERS, max_pending=None, batch_size=BATCH_SIZE,
+                 keepalive=KEEPALIVE_SECONDS, max_body=MAX_BODY, memory_mb=MEMORY_MB, rules=None,
+                 cache_path=None, cache_entries=256):
+        self.workers = workers
+        self.max_pending = max_pending or workers * PENDING_PER_WORKER
+        self.batch_size = batch_size
+        self.keepalive = keepalive
+        self.max_body = max_body
+        self.memory_mb = memory_mb
+        self.rules = rules
+        self.cache_path = cache_path
+        self.cache = AnalysisCache(max_entries=cache_entries)
+        self.latency = {}  # endpoint -> LatencyHistogram
+        self.statuses = {}  # HTTP status -> count
+        self.pending = 0  # jobs queued or running
+        self.rejected = 0
+        self.batches = 0
+        self.batched_jobs = 0
+        self._running = 0  # workers busy
+        self._inflight = {}  # job key -> _Job
+        self._queue = None
+        self._slots = None
+        self._executor = None
+        self._server = None
+        self._dispatcher = None
+        self._tasks = set()
+        self._connections = set()
+
+    # ---- pool ----
+    def _start_executor(self):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=_init_worker, initargs=(self.memory_mb, self.cache_path))
+
+    async def _dispatch(self):
+        while True:
+            await self._slots.acquire()
+            jobs = [await self._queue.get()]
+            # share what is queued between the free workers, at most batch_size each
+            free = self.workers - self._running
+            take = min(self.batch_size, math.ceil((self._queue.qsize() + 1) / free))
+            while len(jobs) < take:
+                jobs.append(self._queue.get_nowait())
+            self._running += 1
+            task = asyncio.create_task(self._run_batch(jobs))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, jobs):
+        from concurrent.futures.process import BrokenProcessPool
+        executor = self._executor
+        work = [(job.op, job.code, job.max_line_len, job.rules) for job in jobs]
+        self.batches += 1
+        self.batched_jobs += len(jobs)
+        try:
+            outcomes = await asyncio.get_running_loop().run_in_executor(executor, _run_jobs, work)
+        except BrokenProcessPool:
+            # a worker died (e.g. a crash in the parser): fail its batch and start a fresh pool
+            outcomes = [('error', "worker process หยุดทำงานกลางคัน")] * len(jobs)
+            if self._executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._start_executor()
+        except Exception as e:
+            outcomes = [('error', f"{type(e).__name__}: {e}")] * len(jobs)
+        finally:
+            self._running -= 1
+            self._slots.release()
+        for job, (state, payload) in zip(jobs, outcomes):
+            self.pending -= 1
+            self._inflight.pop(job.key, None)
+            if state == 'ok':
+                self.cache.put(job.key, payload)
+            if not job.future.done():
+                job.future.set_result((state, payload))
+
+    # ---- requests ----
+    def _parse_item(self, op, item):
+        if not isinstance(item, dict) or not isinstance(item.get("code"), str):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "ต้องมี \"code\" เป็นข้อความ")
+        max_line_len = item.get("max_line_len", 79)
+        if not isinstance(max_line_len, int) or isinstance(max_line_len, bool) or not 1 <= max_line_len <= MAX_LINE_LEN:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"max_line_len ต้องเป็นจำนวนเต็ม 1-{MAX_LINE_LEN}")
+        rules = self.rules
+        disable, enable = item.get("disable", []), item.get("enable", [])
+        if disable or enable:
+            if not all(isinstance(names, list) and all(isinstance(n, str) for n in names) for names in (disable, enable)):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "disable/enable ต้องเป็นรายการชื่อ rule")
+            try:
+                rules = select(disable=disable, enable=enable, base=rules)
+            except ValueError as e:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, str(e)) from None
+        key = f"{op}:{result_key(item['code'], max_line_len, rules)}"
+        return key, item["code"], max_line_len, rules
+
+    async def _submit(self, op, items):
+        """Outcomes for the parsed items; HTTPError 429 (nothing queued) if the pool is saturated."""
+        loop = asyncio.get_running_loop()
+        waits = []
+        new = []
+        for key, code, max_line_len, rules in items:
+            payload = self.cache.get(key)
+            if payload is not None:
+                waits.append(('ok', payload))
+                continue
+            job = self._inflight.get(key)
+            if job is None:
+                job = _Job(key, op, code, max_line_len, rules, loop.create_future())
+                self._inflight[key] = job
+                new.append(job)
+            waits.append(job.future)
+        if new and self.pending + len(new) > self.max_pending:
+            for job in new:
+                del self._inflight[job.key]
+            self.rejected += 1
+            raise HTTPError(HTTPStatus.TOO_MANY_REQUESTS, "คิววิเคราะห์เต็ม ลองใหม่ภายหลัง")
+        self.pending += len(new)
+        for job in new:
+            self._queue.put_nowait(job)
+        # a shared future must not be cancelled by this client going away
+        return [wait if isinstance(wait, tuple) else await asyncio.shield(wait) for wait in waits]
+
+    async def _work(self, op, body):
+        try:
+            data = json.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "body ไม่ใช่ JSON") from None
+        batch = isinstance(data, dict) and "items" in data
+        items = data["items"] if batch else [data]
+        if not isinstance(items, list) or not items:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "\"items\" ต้องเป็นรายการที่ไม่ว่าง")
+        if len(items) > self.max_pending:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"ส่งได้ครั้งละไม่เกิน {self.max_pending} รายการ")
+        outcomes = await self._submit(op, [self._parse_item(op, item) for item in items])
+        if batch:
+            return HTTPStatus.OK, {'results': [payload if state == 'ok' else {'error': payload}
+                                               for state, payload in outcomes]}
+        state, payload = outcomes[0]
+        if state != 'ok':
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': payload}
+        return HTTPStatus.OK, payload
+
+    def health(self):
+        return {
+            'status': "ok",
+            'workers': self.workers,
+            'busy_workers': self._running,
+            'pending': self.pending,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'max_pending': self.max_pending,
+            'rejected': self.rejected,
+            'batches': self.batches,
+            'mean_batch_size': self.batched_jobs / self.batches if self.batches else None,
+            'connections': len(self._connections),
+            'statuses': {str(status): n for status, n in sorted(self.statuses.items())},
+            'cache': self.cache.stats(),
+        }
+
+    async def _route(self, request):
+        endpoint = request.path.strip("/")
+        if endpoint in OPERATIONS:
+            if request.method != "POST":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "ใช้ POST")
+            return await self._work(endpoint, request.body)
+        if endpoint in ("latency", "health"):
+            if request.method != "GET":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "ใช้ GET")
+            if endpoint == "health":
+                return HTTPStatus.OK, self.health()
+            return HTTPStatus.OK, {name: hist.to_dict() for name, hist in sorted(self.latency.items())}
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"ไม่มี endpoint {request.path}")
+
+    def _observe(self, endpoint, status, start):
+        hist = self.latency.get(endpoint)
+        if hist is None:
+            hist = self.latency[endpoint] = LatencyHistogram()
+        hist.observe((time.perf_counter() - start) * 1000)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    async def _serve_connection(self, reader, writer):
+        self._connections.add(writer)
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader, self.max_body), self.keepalive)
+                except HTTPError as e:
+                    writer.write(encode_response(e.status, {'error': str(e)}, keep_alive=False))
+                    await writer.drain()
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+                start = time.perf_counter()
+                keep_alive = request.keep_alive()
+                headers = ()
+                try:
+                    status, payload = await self._route(request)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': str(e)}
+                    if status == HTTPStatus.TOO_MANY_REQUESTS:
+                        headers = (("Retry-After", RETRY_AFTER),)
+                writer.write(encode_response(status, payload, keep_alive, headers))
+                await writer.drain()
+                endpoint = request.path.strip("/")
+                self._observe(endpoint if endpoint in OPERATIONS or endpoint in ("latency", "health") else "other",
+                              int(status), start)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    # ---- lifecycle ----
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        """Start the pool and listen; returns the bound (host, port) (port 0 picks a free one)."""
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._start_executor()
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        self._server = await asyncio.start_server(self._serve_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT, ready=None):
+        """Run until cancelled; `ready(host, port)` is called once listening."""
+        address = await self.start(host, port)
+        if ready is not None:
+            ready(*address)
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+# -----------------------
+# Command line
+# -----------------------
+def main(argv=None):
+    import argparse
+    import sys
+
+    from error_helper.diskcache import default_path
+    from error_helper.rules import all_rules, find_config, load_config
+
+    parser = argparse.ArgumentParser(prog="error_helper.server", description="Serve the analyzers over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help=f"analysis worker processes (default: CPU count, at least {DEFAULT_WORKERS})")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help=f"queued + running jobs before answering 429 (default: {PENDING_PER_WORKER} per worker)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="most jobs handed to a worker at once")
+    parser.add_argument("--keepalive", type=float, default=KEEPALIVE_SECONDS, help="idle seconds before closing a connection")
+    parser.add_argument("--memory-mb", type=int, default=MEMORY_MB, help="address-space limit per worker (0: none)")
+    parser.add_argument("--cache", default=None, metavar="FILE",
+                        help="persistent result cache shared with the web page and batch mode (default: as there)")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the persistent cache")
+    parser.add_argument("--config", default=None, metavar="FILE",
+                        help="base rule selection (default: nearest error_helper.toml or pyproject.toml [tool.error_helper])")
+    args = parser.parse_args(argv)
+    all_rules()
+    config = args.config or find_config()
+    try:
+        rules = load_config(config) if config else None
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    service = AnalysisService(workers=args.workers or max(DEFAULT_WORKERS, os.cpu_count() or 1),
+                              max_pending=args.max_pending, batch_size=args.batch_size, keepalive=args.keepalive,
+                              memory_mb=args.memory_mb, rules=rules,
+                              cache_path=None if args.no_cache else (args.cache or default_path()))
+
+    def ready(host, port):
+        print(f"error_helper.server: http://{host}:{port} ({service.workers} workers)", file=sys.stderr, flush=True)
+    try:
+        asyncio.run(service.serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
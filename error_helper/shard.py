@@ -0,0 +1,177 @@
+"""
+Parallel analysis of one large file: its top-level statements are split into shards of
+contiguous lines that run through the block analyzers (PEP8 and naming, explanations,
+per-function performance data) on a process pool, then merge in line order.
+
+Shards are whole blocks of error_helper.incremental, so the merge is the incremental
+analyzer's: whole-module checks (main guard, structure, the recursion call graph, the
+ranking of hints) run once over the merged data, and the output is identical to
+do_full_analysis.
+
+To keep the parent's serial part small, it does not parse the file: it cuts at lines
+that look like the start of a top-level statement (column 0, after the previous code
+line), and each worker parses its own shard. A cut inside a statement (a multi-line
+string, a bracket) makes the shard before it fail to parse, or end past the cut; that
+shard is joined with the next and the pair retried. Only if that fails too does the
+parent parse the whole file once and cut at real block boundaries.
+
+The kinds the performance analyzer infers for globals flow from earlier statements to
+later ones, which parallel shards cannot see. Shards therefore report the globals they
+relied on; shards whose assumption turns out wrong once the earlier shards are known
+run again with the right kinds (a rare second round; each round settles at least the
+first wrong shard).
+"""
+import ast
+import os
+
+from error_helper.core import do_full_analysis, normalize_indentation, safe_parse
+from error_helper.incremental import analyze_block, merge_blocks, split_blocks
+from error_helper.instrument import stage
+
+# smaller shards cost more in pickling and process hand-off than they save
+MIN_SHARD_LINES = 2000
+# a few shards per worker keep the tail balanced when shards differ in cost
+SHARDS_PER_JOB = 4
+# column-0 lines that continue the statement before them
+_CONTINUATIONS = ("else", "elif", "except", "finally", "case")
+
+def _is_code(line):
+    stripped = line.lstrip()
+    return bool(stripped) and not stripped.startswith("#")
+
+def guess_cuts(lines, n_shards):
+    """
+    Start lines (1-based) of up to n_shards shards, cut where a top-level statement seems
+    to begin. Leading blank lines, comments and decorators stay with the statement below
+    them, as in split_blocks.
+    """
+    cuts = [1]
+    target = len(lines) / n_shards
+    i = int(target)
+    while i < len(lines) and len(cuts) < n_shards:
+        line = lines[i]
+        if line[:1].isalpha() or line[:1] == "_":
+            word = line.split(None, 1)[0].rstrip(":")
+            if word not in _CONTINUATIONS:
+                # back over the comments, blank lines and decorators in front of it
+                cut = i
+                while cut > 0 and (not _is_code(lines[cut - 1]) or lines[cut - 1].startswith("@")):
+                    cut -= 1
+                previous = lines[cut - 1].rstrip() if cut > 0 else ""
+                if cut + 1 > cuts[-1] and not previous.endswith(("\\", ",", "(", "[", "{")):
+                    cuts.append(cut + 1)
+                    i = max(i + 1, int(target * len(cuts)))
+                    continue
+        i += 1
+    return cuts
+
+def block_cuts(tree, n_lines, n_shards):
+    """Start lines of up to n_shards shards of similar size, at real block boundaries."""
+    blocks = split_blocks(tree, n_lines)
+    target = max(1, -(-n_lines // n_shards))
+    cuts = [1]
+    for start, _, _ in blocks[1:]:
+        if start - cuts[-1] >= target:
+            cuts.append(start)
+    return cuts
+
+def _analyze_shard(job):
+    """
+    Pool worker: parse one shard and analyze it as one block (line numbers relative to its
+    start). None if it does not parse or its last statement runs past the shard.
+    """
+    text, start, first, last, max_line_len, rules, module_kinds = job
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return None
+    block_lines = text.split("\n")
+    if not last and (not tree.body or tree.body[-1].end_lineno != len(block_lines)):
+        # trailing comments after the last statement would belong to the next block
+        return None
+    ast.increment_lineno(tree, start - 1)
+    return analyze_block(block_lines, start, tree.body, first, max_line_len=max_line_len, rules=rules,
+                         module_kinds=module_kinds)
+
+def _stale(parts):
+    """Indexes of shards that assumed a different kind for a global than the shards before them set."""
+    module_kinds = {}
+    stale = []
+    for index, data in enumerate(parts):
+        if any(module_kinds.get(name) != kind for name, kind in data['perf']['kind_deps'].items()):
+            stale.append(index)
+        module_kinds.update(data['perf']['module_kinds'])
+    return stale
+
+def _kinds_before(parts, index):
+    module_kinds = {}
+    for data in parts[:index]:
+        module_kinds.update(data['perf']['module_kinds'])
+    return module_kinds
+
+def _jobs(lines, cuts, max_line_len, rules):
+    ends = cuts[1:] + [len(lines) + 1]
+    return [("\n".join(lines[start - 1:end - 1]), start, start == 1, end > len(lines), max_line_len, rules, None)
+            for start, end in zip(cuts, ends)]
+
+def _analyze(pool, jobs, done):
+    """Data (None where the cut was wrong) per job; shards already in `done` are not run again."""
+    todo = [job for job in jobs if job[:2] not in done]
+    for job, data in zip(todo, pool.map(_analyze_shard, todo, chunksize=1)):
+        done[job[:2]] = data
+    return [done[job[:2]] for job in jobs]
+
+def analyze_sharded(code, max_line_len=79, rules=None, jobs=None, pool=None, min_shard_lines=MIN_SHARD_LINES):
+    """
+    do_full_analysis of one file, split across `pool` (a multiprocessing.Pool; one with
+    `jobs` workers is started if None). Files under two shards' worth of lines, and
+    code that does not parse, are analyzed in-process.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    with stage("normalize"):
+        code_norm = normalize_indentation(code)
+    lines = code_norm.splitlines()
+    n_shards = min(jobs * SHARDS_PER_JOB, len(lines) // min_shard_lines)
+    if n_shards < 2:
+        return do_full_analysis(code, max_line_len=max_line_len, rules=rules)
+    own_pool = None
+    if pool is None:
+        from multiprocessing import Pool  # only the parent needs the pool machinery
+        pool = own_pool = Pool(processes=min(jobs, n_shards))
+    done = {}  # (text, start) -> data
+    try:
+        with stage("shard.analyze"):
+            cuts = guess_cuts(lines, n_shards)
+            shard_jobs = _jobs(lines, cuts, max_line_len, rules)
+            parts = _analyze(pool, shard_jobs, done)
+            if None in parts:
+                # join each failed shard with the next, unless the cut in front of it is already gone
+                drop = set()
+                for index, data in enumerate(parts):
+                    if data is None and index not in drop and index + 1 < len(cuts):
+                        drop.add(index + 1)
+                cuts = [cut for index, cut in enumerate(cuts) if index not in drop]
+                shard_jobs = _jobs(lines, cuts, max_line_len, rules)
+                parts = _analyze(pool, shard_jobs, done)
+        if None in parts:
+            with stage("parse"):
+                tree, _ = safe_parse(code_norm)
+            if tree is None:
+                # broken code goes through auto-fix
+                return do_full_analysis(code, max_line_len=max_line_len, rules=rules)
+            with stage("shard.analyze"):
+                cuts = block_cuts(tree, len(lines), n_shards)
+                shard_jobs = _jobs(lines, cuts, max_line_len, rules)
+                parts = _analyze(pool, shard_jobs, done)
+        with stage("shard.analyze"):
+            stale = _stale(parts)
+            while stale:
+                reruns = [shard_jobs[index][:-1] + (_kinds_before(parts, index),) for index in stale]
+                for index, data in zip(stale, pool.map(_analyze_shard, reruns, chunksize=1)):
+                    parts[index] = data
+                stale = _stale(parts)
+    finally:
+        if own_pool is not None:
+            own_pool.close()
+            own_pool.join()
+    return merge_blocks(code_norm, list(zip(cuts, parts)), rules)
@@ -0,0 +1,66 @@
+"""
+Source fragments for AST nodes, sliced from the original text instead of ast.unparse.
+
+A line-offset index is built once per source; a node's text is then one slice between
+its (lineno, col_offset) and (end_lineno, end_col_offset). Only the first `limit`
+characters are ever looked at, whitespace is collapsed to fit on one line, and
+identical fragments are normalized once, so describing a node costs O(limit) however
+large its subtree is.
+"""
+import re
+
+FRAGMENT_LIMIT = 80
+
+# the tokenizer's line breaks (str.splitlines would also split on \f, \v, \x1c, ...)
+_newline_re = re.compile(r"\r\n|\r|\n")
+
+class SourceIndex:
+    """Line-offset index over `code`, whose first line is `first_lineno` in the tree's numbering."""
+    def __init__(self, code, first_lineno=1, limit=FRAGMENT_LIMIT):
+        self.code = code
+        self.first_lineno = first_lineno
+        self.limit = limit
+        self.starts = [0]
+        self.starts.extend(m.end() for m in _newline_re.finditer(code))
+        self._memo = {}
+        self._byte_cols = {}  # row -> byte column to character column, for non-ASCII lines
+
+    def _columns(self, row):
+        cols = self._byte_cols.get(row)
+        if cols is None:
+            start = self.starts[row]
+            end = self.starts[row + 1] if row + 1 < len(self.starts) else len(self.code)
+            line = self.code[start:end]
+            if line.isascii():
+                cols = False
+            else:
+                cols = []
+                for i, ch in enumerate(line):
+                    cols.extend([i] * len(ch.encode("utf-8", "surrogatepass")))
+                cols.append(len(line))
+            self._byte_cols[row] = cols
+        return cols
+
+    def offset(self, lineno, col):
+        """Character offset of (lineno, UTF-8 byte column) as found on AST nodes."""
+        row = lineno - self.first_lineno
+        cols = self._columns(row)
+        # each line is scanned once; ASCII lines (the common case) map columns 1:1
+        return self.starts[row] + (cols[min(col, len(cols) - 1)] if cols else col)
+
+    def fragment(self, node, default=""):
+        """One-line source text of `node`, truncated to `limit` characters ('…' marks a cut)."""
+        try:
+            a = self.offset(node.lineno, node.col_offset)
+            b = self.offset(node.end_lineno, node.end_col_offset)
+        except (AttributeError, IndexError, TypeError):
+            return default
+        # read a little past the limit: collapsing whitespace can only shorten it
+        raw = self.code[a:min(b, a + 2 * self.limit)]
+        text = self._memo.get(raw)
+        if text is None:
+            text = " ".join(raw.split())
+            self._memo[raw] = text
+        if len(text) > self.limit or a + len(raw) < b:
+            return text[:self.limit].rstrip() + "…"
+        return text or default
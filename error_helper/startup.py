@@ -0,0 +1,98 @@
+"""
+Import and worker-startup cost of the analysis core, measured in fresh interpreters
+(process-pool and serverless workers pay this on every spawn).
+
+    python -m error_helper.startup                  # report
+    python -m error_helper.startup --budget-ms 3    # exit 1 if error_helper.core adds more than 3 ms
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+MODULES = ("error_helper", "error_helper.core", "error_helper.cache", "error_helper.batch")
+# stdlib modules the core cannot avoid; their cost is the floor for any worker
+STDLIB_FLOOR = "ast, re, collections, tokenize"
+# modules the core must never drag into a worker
+FORBIDDEN = ("streamlit",)
+
+_IMPORT_PROBE = """
+import sys, time
+before = set(sys.modules)
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+leaked = [m for m in {forbidden!r} if m in sys.modules]
+print(elapsed * 1000, len(set(sys.modules) - before), ",".join(leaked))
+"""
+
+_WORKER_PROBE = "import error_helper.core as c; c.do_full_analysis('x = 1\\n')"
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _python_env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.path.dirname(PACKAGE_DIR) + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+def precompile():
+    """Write .pyc files first, as a deployed install would have them (PYTHONDONTWRITEBYTECODE otherwise skews timings)."""
+    import compileall
+    compileall.compile_dir(PACKAGE_DIR, quiet=1)
+
+def measure_import(module, runs=7):
+    """Median import time (ms) of `module` in a fresh interpreter, modules added, forbidden modules loaded."""
+    times = []
+    added = 0
+    leaked = []
+    code = _IMPORT_PROBE.format(module=module, forbidden=FORBIDDEN)
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=_python_env(), check=True)
+        ms, n, leak = (proc.stdout.strip().split(" ") + [""])[:3]
+        times.append(float(ms))
+        added = int(n)
+        leaked = [m for m in leak.split(",") if m]
+    return {'module': module, 'import_ms': statistics.median(times), 'modules_added': added, 'leaked': leaked}
+
+def _spawn_ms(code, runs):
+    import time
+    times = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], env=_python_env(), check=True)
+        times.append((time.perf_counter() - t) * 1000)
+    return statistics.median(times)
+
+def measure_worker_startup(runs=7):
+    """Median wall time (ms) of a worker that imports the core and analyzes one line, vs a bare interpreter."""
+    baseline = _spawn_ms("pass", runs)
+    worker = _spawn_ms(_WORKER_PROBE, runs)
+    return {'interpreter_ms': baseline, 'worker_ms': worker, 'overhead_ms': worker - baseline}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="error_helper.startup", description="Measure import and worker startup cost.")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail when error_helper.core costs more than this on top of its stdlib floor")
+    args = parser.parse_args(argv)
+
+    precompile()
+    ok = True
+    floor = measure_import(STDLIB_FLOOR, runs=args.runs)['import_ms']
+    print(f"{'stdlib floor':<22} {floor:7.2f} ms  ({STDLIB_FLOOR})")
+    for module in MODULES:
+        m = measure_import(module, runs=args.runs)
+        print(f"{m['module']:<22} {m['import_ms']:7.2f} ms  (+{m['modules_added']} modules)")
+        if m['leaked']:
+            ok = False
+            print(f"  !! imports {', '.join(m['leaked'])}")
+        if module == "error_helper.core" and args.budget_ms is not None and m['import_ms'] - floor > args.budget_ms:
+            ok = False
+            print(f"  !! {m['import_ms'] - floor:.2f} ms over the stdlib floor (budget {args.budget_ms:.1f} ms)")
+    w = measure_worker_startup(runs=args.runs)
+    print(f"worker startup         {w['worker_ms']:7.2f} ms  (interpreter alone {w['interpreter_ms']:.2f} ms, "
+          f"overhead {w['overhead_ms']:.2f} ms)")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""
+Filtering, sorting, grouping and paging of result rows for the UI (no Streamlit here).
+
+The page shows one table per result list and only ever hands the current page to the
+frontend, so render time and payload stay bounded however many issues a file has.
+"""
+from collections import Counter
+
+PAGE_SIZES = (50, 100, 200, 500)
+
+def count_by_code(issues):
+    """[(code, count)] for pep8 issues, most frequent first."""
+    counts = Counter(code for _, code, _ in issues)
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+def filter_issues(issues, codes=None, text=""):
+    """Issues whose code is in `codes` (all if empty) and whose message contains `text`."""
+    codes = set(codes or ())
+    text = text.strip().lower()
+    return [issue for issue in issues
+            if (not codes or issue[1] in codes) and (not text or text in issue[2].lower())]
+
+def filter_explanations(explanations, text=""):
+    text = text.strip().lower()
+    if not text:
+        return explanations
+    return [row for row in explanations if text in row[1].lower()]
+
+def sort_rows(rows, column, descending=False):
+    """Stable sort by tuple position `column`; the line number breaks ties."""
+    return sorted(rows, key=lambda row: (row[column], row[0]), reverse=descending)
+
+def page_slice(rows, page, page_size):
+    """(rows on `page` (1-based, clamped), clamped page, page count)."""
+    n_pages = max(1, -(-len(rows) // page_size))
+    page = min(max(1, page), n_pages)
+    start = (page - 1) * page_size
+    return rows[start:start + page_size], page, n_pages